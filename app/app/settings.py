@@ -37,6 +37,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "core",
     "rest_framework",
     "rest_framework.authtoken",
@@ -90,6 +91,24 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+# The local memory cache is per process. Every user's version keys and
+# cached list and stats responses share its entries, so it holds many
+# more than the default 300. Deployments with several processes should
+# point RECIPE_CACHE_ALIAS at a shared backend such as Redis or Memcached.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "recipe-api",
+        "OPTIONS": {
+            "MAX_ENTRIES": 10000,
+        },
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -139,8 +158,69 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AUTH_USER_MODEL = "core.User"
 
+# The browsable API is only rendered when enabled, e.g. in development.
+BROWSABLE_API = bool(int(os.environ.get("BROWSABLE_API", 0)))
+
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": ["core.renderers.ORJSONRenderer"] + (
+        ["rest_framework.renderers.BrowsableAPIRenderer"]
+        if BROWSABLE_API else []
+    ),
+    "DEFAULT_PARSER_CLASSES": [
+        "core.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+}
+
+# Default and maximum page sizes of the recipe list endpoint.
+RECIPE_PAGE_SIZE = 100
+RECIPE_MAX_PAGE_SIZE = 1000
+
+# Default and maximum number of tag and ingredient suggestions.
+RECIPE_AUTOCOMPLETE_LIMIT = 10
+RECIPE_AUTOCOMPLETE_MAX_LIMIT = 50
+
+# Default and maximum number of recipes matching a pantry, and the most
+# ingredients a pantry can hold.
+RECIPE_PANTRY_LIMIT = 50
+RECIPE_PANTRY_MAX_LIMIT = 200
+RECIPE_PANTRY_MAX_INGREDIENTS = 100
+
+# Default and maximum number of similar recipes, and the weight of a
+# shared tag or ingredient in their similarity.
+RECIPE_SIMILAR_LIMIT = 10
+RECIPE_SIMILAR_MAX_LIMIT = 50
+RECIPE_SIMILARITY_WEIGHTS = {"tags": 1, "ingredients": 2}
+
+# Most recipes a shopping list can be made of.
+RECIPE_SHOPPING_LIST_MAX_RECIPES = 100
+
+# Number of histogram buckets and of top tags and ingredients in the
+# recipe statistics.
+RECIPE_STATS_BUCKETS = 10
+RECIPE_STATS_TOP = 10
+
+# Recipes loaded per query while streaming an export.
+RECIPE_EXPORT_CHUNK_SIZE = 2000
+
+# Rows validated and committed together by recipe imports, and the
+# number of row errors an import reports.
+RECIPE_IMPORT_CHUNK_SIZE = 1000
+RECIPE_IMPORT_MAX_ERRORS = 100
+
+# Cache and timeout in seconds of the recipe API list responses.
+RECIPE_CACHE_ALIAS = "default"
+RECIPE_CACHE_TIMEOUT = 300
+
+# Maximum number of operations in one bulk recipe request.
+RECIPE_BULK_MAX_ITEMS = 1000
+
+# In-process cache of authenticated users by token key, TTL in seconds.
+TOKEN_AUTH_CACHE = {
+    "MAX_SIZE": 10000,
+    "TTL": 300,
 }
 
 SPECTACULAR_SETTINGS = {
@@ -0,0 +1,87 @@
+"""
+Django command to compare the JSON renderers.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.management.utils import get_largest_user
+from core.models import Recipe
+from core.renderers import ORJSONRenderer
+from recipe.readers import RecipeReader
+from recipe.serializers import RecipeDetailSerializer
+
+
+class Command(BaseCommand):
+    """Django command to time rendering recipe lists to JSON.
+
+    The recipes are loaded once, e.g. from a database filled with
+    `seed_recipes`, so only the rendering is timed.
+    """
+
+    help = "Time rendering recipe lists with DRF's and the orjson renderer."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--email",
+            help="User to read recipes of, defaults to the largest one.",
+        )
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=[1000, 10000],
+            help="Numbers of recipes to render.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Runs per renderer, the fastest one is reported.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        user = get_largest_user(options["email"])
+        request = Request(APIRequestFactory().get("/"))
+        request.user = user
+        reader = RecipeReader(
+            RecipeDetailSerializer,
+            RecipeDetailSerializer.Meta.fields,
+            {"request": request},
+        )
+
+        for size in options["sizes"]:
+            rows = Recipe.objects.filter(user=user).order_by("-id").values(
+                *reader.get_columns()
+            )[:size]
+            data = {"next": None, "results": reader.render(rows)}
+            timings = {}
+            for name, renderer in (
+                ("json", JSONRenderer()),
+                ("orjson", ORJSONRenderer()),
+            ):
+                timings[name], body = self._time(
+                    renderer, data, options["repeat"]
+                )
+            megabytes = len(body) / 1024 / 1024
+            self.stdout.write(
+                f"{len(data['results'])} recipes ({megabytes:.1f} MB): "
+                f"json {timings['json'] * 1000:.1f} ms, "
+                f"orjson {timings['orjson'] * 1000:.1f} ms, "
+                f"{timings['json'] / timings['orjson']:.1f}x faster"
+            )
+
+    def _time(self, renderer, data, repeat):
+        """Return the fastest render time of a renderer and its output."""
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            body = renderer.render(data)
+            timings.append(time.perf_counter() - start)
+
+        return min(timings), body
@@ -0,0 +1,114 @@
+"""
+Django command to compare the recipe read paths.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Prefetch
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.management.utils import get_largest_user
+from core.models import Recipe, Tag, Ingredient
+from recipe.readers import RecipeReader
+from recipe.serializers import RecipeSerializer
+
+
+class Command(BaseCommand):
+    """Django command to time rendering recipe lists.
+
+    Both paths load and render the same recipes to JSON, e.g. from a
+    database filled with `seed_recipes`, and must render the same bytes.
+    """
+
+    help = "Time rendering recipes with the serializer and the reader."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--email",
+            help="User to read recipes of, defaults to the largest one.",
+        )
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=[1000, 10000],
+            help="Numbers of recipes to render.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Runs per path, the fastest one is reported.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        user = get_largest_user(options["email"])
+        request = Request(APIRequestFactory().get("/"))
+        request.user = user
+        context = {"request": request, "format": None, "view": None}
+
+        for size in options["sizes"]:
+            ids = list(
+                Recipe.objects.filter(user=user)
+                .order_by("-id")
+                .values_list("id", flat=True)[:size]
+            )
+            serializer_time, serializer_body = self._time(
+                self._render_serializer, ids, context, options["repeat"]
+            )
+            reader_time, reader_body = self._time(
+                self._render_reader, ids, context, options["repeat"]
+            )
+            if reader_body != serializer_body:
+                raise CommandError(
+                    "The reader output differs from the serializer output."
+                )
+            self.stdout.write(
+                f"{len(ids)} recipes: "
+                f"serializer {serializer_time * 1000:.1f} ms, "
+                f"reader {reader_time * 1000:.1f} ms, "
+                f"{serializer_time / reader_time:.1f}x faster"
+            )
+
+    def _time(self, render, ids, context, repeat):
+        """Return the fastest run time of a path and its output."""
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            body = render(ids, context)
+            timings.append(time.perf_counter() - start)
+
+        return min(timings), body
+
+    def _render_serializer(self, ids, context):
+        """Render recipes the way the serializer path loads them."""
+        fields = [
+            field for field in RecipeSerializer.Meta.fields
+            if field not in ("tags", "ingredients")
+        ]
+        queryset = Recipe.objects.filter(id__in=ids).order_by("-id").only(
+            *fields
+        ).prefetch_related(
+            Prefetch("tags", queryset=Tag.objects.order_by("id")),
+            Prefetch(
+                "ingredients", queryset=Ingredient.objects.order_by("id")
+            ),
+        )
+        data = RecipeSerializer(queryset, many=True, context=context).data
+
+        return JSONRenderer().render(data)
+
+    def _render_reader(self, ids, context):
+        """Render recipes from rows with the reader."""
+        reader = RecipeReader(
+            RecipeSerializer, RecipeSerializer.Meta.fields, context
+        )
+        rows = Recipe.objects.filter(id__in=ids).order_by("-id").values(
+            *reader.get_columns()
+        )
+
+        return JSONRenderer().render(reader.render(rows))
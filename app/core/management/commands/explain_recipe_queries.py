@@ -0,0 +1,150 @@
+"""
+Django command to print the query plans of the recipe API.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.management.utils import get_largest_user
+from core.models import Recipe, Tag, Ingredient
+from recipe import views
+
+
+class Command(BaseCommand):
+    """Django command to explain the recipe API queries.
+
+    Run it before and after migrating to compare the plans, e.g. on a
+    database filled with `seed_recipes`.
+    """
+
+    help = "Print EXPLAIN ANALYZE output for the recipe API queries."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--email",
+            help="User to run the queries as, defaults to the largest one.",
+        )
+        parser.add_argument(
+            "--no-analyze",
+            action="store_true",
+            help="Only plan the queries instead of running them.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        user = get_largest_user(options["email"])
+        tags = self._sample_ids(Tag, user)
+        ingredients = self._sample_ids(Ingredient, user)
+        pantry = self._sample_ids(Ingredient, user, count=10)
+        recipe = {"pk": self._sample_ids(Recipe, user, count=1)}
+        page_size = settings.RECIPE_PAGE_SIZE
+
+        queries = [
+            ("Recipe list", views.RecipeViewSet, {}, page_size),
+            (
+                "Recipes with any tag",
+                views.RecipeViewSet, {"tags": tags}, page_size,
+            ),
+            (
+                "Recipes with all tags",
+                views.RecipeViewSet,
+                {"tags": tags, "tags_match": "all"},
+                page_size,
+            ),
+            (
+                "Recipes with any ingredient",
+                views.RecipeViewSet, {"ingredients": ingredients}, page_size,
+            ),
+            (
+                "Quick cheap recipes",
+                views.RecipeViewSet,
+                {"max_time": 30, "max_price": 10},
+                page_size,
+            ),
+            (
+                "Recipes by price",
+                views.RecipeViewSet, {"ordering": "price"}, page_size,
+            ),
+            (
+                "Slowest recipes under an hour",
+                views.RecipeViewSet,
+                {"ordering": "-time_minutes", "max_time": 60},
+                page_size,
+            ),
+            (
+                "Recipe search",
+                views.RecipeViewSet, {"search": "chicken"}, page_size,
+            ),
+            (
+                "Recipe search with prefixes",
+                views.RecipeViewSet, {"search": "spic chick"}, page_size,
+            ),
+            (
+                "Pantry matches",
+                views.RecipeViewSet, {"pantry": pantry}, page_size, "pantry",
+            ),
+            (
+                "Similar recipes",
+                views.RecipeViewSet, {}, settings.RECIPE_SIMILAR_LIMIT,
+                "similar", recipe,
+            ),
+            ("Tag list", views.TagViewSet, {}, None),
+            (
+                "Assigned tags",
+                views.TagViewSet, {"assigned_only": 1}, None,
+            ),
+            (
+                "Tags with counts",
+                views.TagViewSet, {"with_counts": 1}, None,
+            ),
+            (
+                "Tag autocomplete",
+                views.TagViewSet, {"q": "tag 1"}, None,
+            ),
+            ("Ingredient list", views.IngredientsViewSet, {}, None),
+            (
+                "Assigned ingredients",
+                views.IngredientsViewSet, {"assigned_only": 1}, None,
+            ),
+            (
+                "Ingredients with counts",
+                views.IngredientsViewSet, {"with_counts": 1}, None,
+            ),
+            (
+                "Ingredient autocomplete",
+                views.IngredientsViewSet, {"q": "ingr 4"}, None,
+            ),
+        ]
+        # Entries run the list action unless they name another one, and
+        # the URL arguments of a detail action.
+        for title, viewset, params, limit, *view in queries:
+            queryset = self._get_queryset(viewset, user, params, *view)
+            if limit is not None:
+                queryset = queryset[:limit]
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{title}:"))
+            self.stdout.write(queryset.explain(
+                analyze=not options["no_analyze"],
+                buffers=not options["no_analyze"],
+            ))
+            self.stdout.write("")
+
+    def _sample_ids(self, model, user, count=2):
+        """Return a few of the user's object IDs as a filter parameter."""
+        ids = model.objects.filter(user=user).values_list("id", flat=True)
+
+        return ",".join(str(obj_id) for obj_id in ids[:count])
+
+    def _get_queryset(self, viewset, user, params, action="list", kwargs=None):
+        """Return the queryset a viewset action builds for a request."""
+        request = Request(APIRequestFactory().get("/", params))
+        request.user = user
+        view = viewset(
+            request=request,
+            action=action,
+            format_kwarg=None,
+            kwargs=kwargs or {},
+        )
+
+        return view.get_queryset()
@@ -0,0 +1,81 @@
+"""
+Django command to import recipes from a file.
+"""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from recipe.imports import READERS, RecipeImporter
+
+
+class Command(BaseCommand):
+    """Django command to import recipes from NDJSON or CSV files.
+
+    Every chunk is committed on its own, so an interrupted import resumes
+    with --start-line set to the last committed line.
+    """
+
+    help = "Import recipes for a user from an NDJSON or CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import.")
+        parser.add_argument(
+            "--email",
+            required=True,
+            help="User to import the recipes for.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=sorted(READERS),
+            help="File format, defaults to csv for .csv files, else ndjson.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            help="Rows validated and committed together.",
+        )
+        parser.add_argument(
+            "--start-line",
+            type=int,
+            default=0,
+            help="Skip the lines up to this one, committed by a past run.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        try:
+            user = get_user_model().objects.get(email=options["email"])
+        except get_user_model().DoesNotExist:
+            raise CommandError("No matching user found.")
+        file_format = options["format"] or (
+            "csv" if options["path"].lower().endswith(".csv") else "ndjson"
+        )
+        importer = RecipeImporter(user, chunk_size=options["chunk_size"])
+        last_line = options["start_line"]
+
+        def progress(result):
+            nonlocal last_line
+            last_line = result["last_line"]
+            self.stdout.write(
+                f"Committed up to line {last_line}: "
+                f"{result['created']} created, {result['failed']} failed."
+            )
+
+        try:
+            with open(options["path"], "rb") as import_file:
+                result = importer.run(
+                    READERS[file_format](import_file),
+                    start_line=options["start_line"],
+                    progress=progress,
+                )
+        except (Exception, KeyboardInterrupt) as exc:
+            raise CommandError(
+                f"Import stopped ({exc!r}), resume with "
+                f"--start-line {last_line}."
+            ) from exc
+
+        for error in result["errors"]:
+            self.stderr.write(f"Line {error['line']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result['created']} recipes, "
+            f"{result['failed']} rows failed."
+        ))
@@ -0,0 +1,40 @@
+"""
+Django command to repair the recipe counts of tags and ingredients.
+"""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Tag, Ingredient
+
+
+class Command(BaseCommand):
+    """Django command to recompute the recipe counts from the links.
+
+    The counts are kept up to date on writes, this fixes them after links
+    were changed behind the ORM's back, e.g. with raw SQL.
+    """
+
+    help = "Recompute the recipe counts of tags and ingredients."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--email",
+            help="Only repair the counts of this user.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        filters = {}
+        if options["email"]:
+            try:
+                filters["user"] = get_user_model().objects.get(
+                    email=options["email"]
+                )
+            except get_user_model().DoesNotExist:
+                raise CommandError("No matching user found.")
+
+        for model in (Tag, Ingredient):
+            repaired = model.objects.recount_recipes(**filters)
+            name = model._meta.verbose_name_plural
+            self.stdout.write(f"Repaired {repaired} {name}.")
+        self.stdout.write(self.style.SUCCESS("Recipe counts are correct."))
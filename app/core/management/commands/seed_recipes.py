@@ -0,0 +1,117 @@
+"""
+Django command to seed the database with a large recipe dataset.
+"""
+import random
+import uuid
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from core.models import Recipe, Tag, Ingredient
+
+
+# Words the seeded titles are made of, so searches match a realistic
+# share of the recipes.
+TITLE_WORDS = (
+    (
+        "Spicy", "Smoky", "Creamy", "Crispy", "Quick", "Roasted",
+        "Grilled", "Lemon", "Garlic", "Honey",
+    ),
+    (
+        "chicken", "beef", "tofu", "salmon", "lentil", "mushroom",
+        "potato", "chickpea", "pork", "shrimp", "spinach", "pumpkin",
+    ),
+    (
+        "curry", "soup", "salad", "stew", "pie", "pasta", "risotto",
+        "tacos", "noodles", "burger",
+    ),
+)
+
+
+class Command(BaseCommand):
+    """Django command to seed benchmark data."""
+
+    help = "Create users with many tagged recipes for benchmarking."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument("--recipes", type=int, default=1_000_000)
+        parser.add_argument("--tags", type=int, default=50)
+        parser.add_argument("--ingredients", type=int, default=200)
+        parser.add_argument("--tags-per-recipe", type=int, default=3)
+        parser.add_argument("--ingredients-per-recipe", type=int, default=8)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        rng = random.Random(options["seed"])
+        # We skip password hashing, seeded users are only used for queries.
+        users = get_user_model().objects.bulk_create([
+            get_user_model()(
+                email=f"seed-{uuid.uuid4().hex}@example.com",
+                name=f"Seed user {n}",
+            )
+            for n in range(options["users"])
+        ])
+        tags = {
+            user.id: self._create_attrs(Tag, user, options["tags"])
+            for user in users
+        }
+        ingredients = {
+            user.id: self._create_attrs(
+                Ingredient, user, options["ingredients"]
+            )
+            for user in users
+        }
+
+        created = 0
+        while created < options["recipes"]:
+            size = min(options["batch_size"], options["recipes"] - created)
+            recipes = Recipe.objects.bulk_create([
+                Recipe(
+                    user=rng.choice(users),
+                    title=" ".join(rng.choice(words) for words in TITLE_WORDS),
+                    description=f"Seeded recipe number {created + n}.",
+                    time_minutes=rng.randint(5, 240),
+                    price=Decimal(rng.randint(100, 99_999)) / 100,
+                )
+                for n in range(size)
+            ])
+            self._link(
+                Recipe.tags.through, "tag_id", recipes, tags,
+                options["tags_per_recipe"], rng,
+            )
+            self._link(
+                Recipe.ingredients.through, "ingredient_id", recipes,
+                ingredients, options["ingredients_per_recipe"], rng,
+            )
+            created += size
+            self.stdout.write(f"Created {created} recipes...")
+
+        # The links were inserted in bulk, so we count them and store their
+        # IDs once at the end.
+        for model in (Tag, Ingredient):
+            model.objects.recount_recipes(user__in=users)
+        Recipe.objects.sync_link_ids(user__in=users)
+        self.stdout.write(self.style.SUCCESS("Database seeded!"))
+
+    def _create_attrs(self, model, user, count):
+        """Create tags or ingredients for a user and return their IDs."""
+        objs = model.objects.bulk_create([
+            model(user=user, name=f"{model.__name__} {n}")
+            for n in range(count)
+        ])
+        return [obj.id for obj in objs]
+
+    def _link(self, through, field, recipes, choices, per_recipe, rng):
+        """Link each recipe to a random sample of the user's objects."""
+        through.objects.bulk_create([
+            through(recipe_id=recipe.id, **{field: obj_id})
+            for recipe in recipes
+            for obj_id in rng.sample(
+                choices[recipe.user_id],
+                min(per_recipe, len(choices[recipe.user_id])),
+            )
+        ])
@@ -0,0 +1,48 @@
+"""
+Django command to check and backfill the tag and ingredient IDs of recipes.
+"""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Recipe
+
+
+class Command(BaseCommand):
+    """Django command to rewrite the recipe ID arrays from the links.
+
+    The arrays are kept up to date on writes, this fills them after links
+    were changed behind the ORM's back, e.g. with raw SQL or a bulk insert.
+    """
+
+    help = "Check or rewrite the tag and ingredient IDs stored on recipes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--email",
+            help="Only sync the recipes of this user.",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report stale recipes, failing if there are any.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        filters = {}
+        if options["email"]:
+            try:
+                filters["user"] = get_user_model().objects.get(
+                    email=options["email"]
+                )
+            except get_user_model().DoesNotExist:
+                raise CommandError("No matching user found.")
+
+        if options["check"]:
+            stale = Recipe.objects.with_stale_link_ids(**filters).count()
+            if stale:
+                raise CommandError(f"{stale} recipes have stale link IDs.")
+        else:
+            synced = Recipe.objects.sync_link_ids(**filters)
+            self.stdout.write(f"Synced {synced} recipes.")
+        self.stdout.write(self.style.SUCCESS("Recipe link IDs are correct."))
@@ -0,0 +1,20 @@
+"""
+Helpers shared by the management commands.
+"""
+from django.contrib.auth import get_user_model
+from django.core.management.base import CommandError
+from django.db.models import Count
+
+
+def get_largest_user(email=None):
+    """Return the user with the email, or the one with the most recipes."""
+    users = get_user_model().objects.all()
+    if email:
+        users = users.filter(email=email)
+    user = users.annotate(
+        recipe_count=Count("recipe")
+    ).order_by("-recipe_count").first()
+    if user is None:
+        raise CommandError("No matching user found.")
+
+    return user
@@ -0,0 +1,39 @@
+# Generated by Django 3.2.25 on 2026-10-18 20:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_recipe_image'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ingredient',
+            index=models.Index(fields=['user', 'name'], name='ingredient_user_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['user', '-id'], name='recipe_user_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['user', 'name'], name='tag_user_name_idx'),
+        ),
+        # The auto-created through tables can't declare indexes. Reverse
+        # lookups had the single column tag_id and ingredient_id indexes,
+        # these also cover the recipe IDs so they don't read the rows.
+        # 0018 drops the single column ones they make redundant.
+        migrations.RunSQL(
+            sql='CREATE INDEX core_recipe_tags_tag_recipe_idx '
+                'ON core_recipe_tags (tag_id, recipe_id);',
+            reverse_sql='DROP INDEX core_recipe_tags_tag_recipe_idx;',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX core_recipe_ingredients_ingredient_recipe_idx '
+                'ON core_recipe_ingredients (ingredient_id, recipe_id);',
+            reverse_sql='DROP INDEX core_recipe_ingredients_ingredient_recipe_idx;',
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 3.2.25 on 2026-10-18 20:55
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def merge_duplicate_names(apps, schema_editor):
+    """Merge tags and ingredients sharing a name into the oldest one."""
+    Recipe = apps.get_model('core', 'Recipe')
+    for model_name, field_name in (('Tag', 'tags'), ('Ingredient', 'ingredients')):
+        model = apps.get_model('core', model_name)
+        through = Recipe._meta.get_field(field_name).remote_field.through
+        related_id = f'{model_name.lower()}_id'
+        duplicates = model.objects.values('user_id', 'name').annotate(
+            keep=Min('id'), copies=Count('id'),
+        ).filter(copies__gt=1)
+        for duplicate in duplicates:
+            keep = duplicate['keep']
+            others = model.objects.filter(
+                user_id=duplicate['user_id'], name=duplicate['name'],
+            ).exclude(id=keep)
+            for other_id in others.values_list('id', flat=True):
+                linked = through.objects.filter(
+                    **{related_id: keep}
+                ).values('recipe_id')
+                through.objects.filter(**{related_id: other_id}).exclude(
+                    recipe_id__in=linked,
+                ).update(**{related_id: keep})
+            others.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_user_access_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_names, migrations.RunPython.noop),
+    ]
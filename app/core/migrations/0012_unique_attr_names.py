@@ -0,0 +1,30 @@
+# Generated by Django 3.2.25 on 2026-10-18 20:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_merge_duplicate_attr_names'),
+    ]
+
+    operations = [
+        # The unique constraints index (user_id, name) as well.
+        migrations.RemoveIndex(
+            model_name='ingredient',
+            name='ingredient_user_name_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='tag',
+            name='tag_user_name_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='ingredient',
+            constraint=models.UniqueConstraint(fields=('user', 'name'), name='unique_ingredient_per_user'),
+        ),
+        migrations.AddConstraint(
+            model_name='tag',
+            constraint=models.UniqueConstraint(fields=('user', 'name'), name='unique_tag_per_user'),
+        ),
+    ]
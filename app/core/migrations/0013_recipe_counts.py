@@ -0,0 +1,53 @@
+# Generated by Django 3.2.25 on 2026-10-18 21:25
+
+from django.db import migrations, models
+
+
+# Backfills the counts with one grouped pass over each through table.
+COUNT_SQL = """
+UPDATE core_{model} SET recipe_count = counts.recipe_count
+FROM (
+    SELECT {model}_id, COUNT(*) AS recipe_count
+    FROM core_recipe_{table}
+    GROUP BY {model}_id
+) AS counts
+WHERE core_{model}.id = counts.{model}_id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_unique_attr_names'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingredient',
+            name='recipe_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='recipe_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        # We count before indexing, so the updates don't maintain the
+        # new indexes.
+        migrations.RunSQL(
+            COUNT_SQL.format(model='ingredient', table='ingredients'),
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.RunSQL(
+            COUNT_SQL.format(model='tag', table='tags'),
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='ingredient',
+            index=models.Index(fields=['user', 'recipe_count', 'name'], name='ingredient_user_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['user', 'recipe_count', 'name'], name='tag_user_count_idx'),
+        ),
+    ]
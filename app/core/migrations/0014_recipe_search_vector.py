@@ -0,0 +1,62 @@
+# Generated by Django 3.2.25 on 2026-10-18 22:10
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# Recomputes the vector when the text changes, or when it's missing, and
+# keeps the stored one otherwise, whatever the UPDATE sent.
+CREATE_TRIGGER_SQL = """
+CREATE FUNCTION core_recipe_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.search_vector IS NOT NULL THEN
+        IF NEW.title IS NOT DISTINCT FROM OLD.title
+            AND NEW.description IS NOT DISTINCT FROM OLD.description
+        THEN
+            NEW.search_vector := OLD.search_vector;
+            RETURN NEW;
+        END IF;
+    END IF;
+    NEW.search_vector :=
+        setweight(to_tsvector('pg_catalog.english', NEW.title), 'A') ||
+        setweight(to_tsvector('pg_catalog.english', NEW.description), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_recipe_search_vector_trigger
+BEFORE INSERT OR UPDATE ON core_recipe
+FOR EACH ROW EXECUTE FUNCTION core_recipe_search_vector_update();
+"""
+
+DROP_TRIGGER_SQL = """
+DROP TRIGGER core_recipe_search_vector_trigger ON core_recipe;
+DROP FUNCTION core_recipe_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_recipe_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunSQL(CREATE_TRIGGER_SQL, reverse_sql=DROP_TRIGGER_SQL),
+        # The trigger fills in the missing vectors, before the index is
+        # built so the updates don't maintain it.
+        migrations.RunSQL(
+            'UPDATE core_recipe SET search_vector = NULL;',
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='recipe_search_idx'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 3.2.25 on 2026-10-18 23:30
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+# Backfills both arrays in one pass, from a grouped pass over each
+# through table.
+LINK_IDS_SQL = """
+UPDATE core_recipe
+SET tag_ids = COALESCE(tags.ids, '{}'),
+    ingredient_ids = COALESCE(ingredients.ids, '{}')
+FROM core_recipe AS recipe
+LEFT JOIN (
+    SELECT recipe_id, ARRAY_AGG(tag_id ORDER BY tag_id) AS ids
+    FROM core_recipe_tags
+    GROUP BY recipe_id
+) AS tags ON tags.recipe_id = recipe.id
+LEFT JOIN (
+    SELECT recipe_id, ARRAY_AGG(ingredient_id ORDER BY ingredient_id) AS ids
+    FROM core_recipe_ingredients
+    GROUP BY recipe_id
+) AS ingredients ON ingredients.recipe_id = recipe.id
+WHERE core_recipe.id = recipe.id
+    AND (tags.ids IS NOT NULL OR ingredients.ids IS NOT NULL);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_recipe_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='ingredient_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='tag_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), blank=True, default=list, editable=False, size=None),
+        ),
+        # We fill the arrays before indexing, so the updates don't
+        # maintain the new indexes.
+        migrations.RunSQL(LINK_IDS_SQL, reverse_sql=migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['tag_ids'], name='recipe_tag_ids_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['ingredient_ids'], name='recipe_ingredient_ids_idx'),
+        ),
+    ]
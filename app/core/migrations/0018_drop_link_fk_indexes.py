@@ -0,0 +1,58 @@
+# Generated by Django 3.2.25 on 2026-10-18 23:40
+
+from django.db import migrations
+
+
+# The (related_id, recipe_id) indexes of 0010 start with the related ID,
+# so they answer every lookup the foreign key indexes Django created on
+# it did, and each link write maintained one extra index.
+LINK_FIELDS = (('tags', 'tag'), ('ingredients', 'ingredient'))
+
+
+def _get_fk_index(schema_editor, through, column):
+    """Return the name of the single column index of a through column."""
+    with schema_editor.connection.cursor() as cursor:
+        constraints = schema_editor.connection.introspection.get_constraints(
+            cursor, through._meta.db_table
+        )
+    for name, constraint in constraints.items():
+        if (
+            constraint['index']
+            and not constraint['unique']
+            and constraint['columns'] == [column]
+        ):
+            return name
+    return None
+
+
+def drop_fk_indexes(apps, schema_editor):
+    """Drop the foreign key indexes on the related IDs of the links."""
+    Recipe = apps.get_model('core', 'Recipe')
+    for field_name, related in LINK_FIELDS:
+        through = Recipe._meta.get_field(field_name).remote_field.through
+        name = _get_fk_index(schema_editor, through, f'{related}_id')
+        if name is not None:
+            schema_editor.execute(
+                schema_editor._delete_index_sql(through, name)
+            )
+
+
+def create_fk_indexes(apps, schema_editor):
+    """Recreate the foreign key indexes on the related IDs of the links."""
+    Recipe = apps.get_model('core', 'Recipe')
+    for field_name, related in LINK_FIELDS:
+        through = Recipe._meta.get_field(field_name).remote_field.through
+        schema_editor.execute(schema_editor._create_index_sql(
+            through, fields=[through._meta.get_field(related)]
+        ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_recipe_link_ids'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_fk_indexes, create_fk_indexes),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 3.2.25 on 2026-10-18 23:50
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_drop_link_fk_indexes'),
+    ]
+
+    operations = [
+        # The tag and ingredient keys are bigints, so the arrays hold them
+        # as bigints too.
+        migrations.AlterField(
+            model_name='recipe',
+            name='ingredient_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AlterField(
+            model_name='recipe',
+            name='tag_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), blank=True, default=list, editable=False, size=None),
+        ),
+    ]
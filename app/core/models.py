@@ -5,7 +5,23 @@ import uuid
 import os
 
 from django.conf import settings
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import (
+    Case,
+    Count,
+    ExpressionWrapper,
+    F,
+    Func,
+    OuterRef,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Coalesce, NullIf
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
@@ -13,6 +29,10 @@ from django.contrib.auth.models import (
 )
 
 
+# Text search configuration of the recipe search vectors.
+SEARCH_CONFIG = "english"
+
+
 def recipe_image_file_path(instance, filename):
     """Generate file path for new recipe image."""
     ext = os.path.splitext(filename)[1]
@@ -47,6 +67,200 @@ class UserManager(BaseUserManager):
         return user
 
 
+class RecipeAttrManager(models.Manager):
+    """Manager for tags and ingredients."""
+
+    def get_or_create_many(self, user, names):
+        """Return a name to ID mapping, creating the missing names."""
+        names = list(dict.fromkeys(names))
+        if not names:
+            return {}
+        ids = dict(
+            self.filter(user=user, name__in=names).values_list("name", "id")
+        )
+        missing = [name for name in names if name not in ids]
+        if missing:
+            # Concurrent requests may create the same names, so we skip
+            # conflicting rows and read back whichever rows won.
+            self.bulk_create(
+                [self.model(user=user, name=name) for name in missing],
+                ignore_conflicts=True,
+            )
+            ids.update(
+                self.filter(user=user, name__in=missing).values_list(
+                    "name", "id"
+                )
+            )
+
+        return {name: ids[name] for name in names if name in ids}
+
+    def add_recipe_counts(self, deltas):
+        """Add the given ID to delta mapping to the recipe counts."""
+        ids_by_delta = {}
+        for pk, delta in deltas.items():
+            if delta:
+                ids_by_delta.setdefault(delta, []).append(pk)
+        if not ids_by_delta:
+            return
+        # One UPDATE adds each delta to its objects, with F() so that
+        # concurrent changes add up.
+        changes = Case(
+            *(
+                When(pk__in=ids, then=Value(delta))
+                for delta, ids in ids_by_delta.items()
+            ),
+            output_field=models.IntegerField(),
+        )
+        changed_ids = [pk for ids in ids_by_delta.values() for pk in ids]
+        self.filter(pk__in=changed_ids).update(
+            recipe_count=F("recipe_count") + changes
+        )
+
+    def recount_recipes(self, **filters):
+        """Recompute the wrong recipe counts and return how many there were.
+
+        The counts are computed from the links of every matching object
+        in one UPDATE.
+        """
+        field = self.model.recipe_set.rel.field
+        related_id = f"{field.m2m_reverse_field_name()}_id"
+        links = field.remote_field.through.objects.filter(
+            **{related_id: OuterRef("pk")}
+        ).order_by().values(related_id).annotate(
+            count=Count("*")
+        ).values("count")
+        actual = Coalesce(
+            Subquery(links, output_field=models.IntegerField()), 0
+        )
+
+        return self.filter(**filters).annotate(actual=actual).exclude(
+            recipe_count=F("actual")
+        ).update(recipe_count=actual)
+
+
+class MissingItems(Func):
+    """The sorted items of an integer array that aren't in a list."""
+
+    output_field = ArrayField(models.BigIntegerField())
+
+    def __init__(self, expression, values, **extra):
+        super().__init__(expression, **extra)
+        self.values = sorted(set(values))
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.source_expressions[0])
+
+        return (
+            f"ARRAY(SELECT item FROM unnest({sql}) AS item "
+            "WHERE item <> ALL(%s) ORDER BY item)",
+            (*params, self.values),
+        )
+
+
+class MatchedItemCount(MissingItems):
+    """The number of items of an integer array that are in a list."""
+
+    output_field = models.IntegerField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.source_expressions[0])
+        # Each value is matched with = ANY(), which costs a fraction of
+        # unnesting the array in a subquery, on every candidate row.
+        matches = " + ".join(
+            f"(%s = ANY({sql}))::int" for value in self.values
+        )
+        matched_params = []
+        for value in self.values:
+            matched_params += [value, *params]
+
+        return f"({matches or '0'})", tuple(matched_params)
+
+
+class MissingItemCount(MatchedItemCount):
+    """The number of items of an integer array that aren't in a list."""
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.source_expressions[0])
+        matched_sql, matched_params = super().as_sql(compiler, connection)
+
+        return (
+            f"(cardinality({sql}) - {matched_sql})",
+            (*params, *matched_params),
+        )
+
+
+class RecipeManager(models.Manager):
+    """Manager for recipes."""
+
+    def get_linked_ids(self, field_name):
+        """Return an expression of the sorted IDs a recipe relation links."""
+        field = self.model._meta.get_field(field_name)
+        related_id = f"{field.m2m_reverse_field_name()}_id"
+        # Subqueries lose their ORDER BY, so the aggregate sorts the IDs.
+        links = field.remote_field.through.objects.filter(
+            recipe_id=OuterRef("pk")
+        ).order_by().values("recipe_id").annotate(
+            ids=ArrayAgg(related_id, ordering=related_id)
+        ).values("ids")
+        output_field = ArrayField(models.BigIntegerField())
+
+        return Coalesce(
+            Subquery(links, output_field=output_field),
+            Value([], output_field=output_field),
+        )
+
+    def get_similarity(self, recipe):
+        """Return an expression of the weighted Jaccard similarity of the
+        tags and ingredients of recipes to the ones of the given recipe.
+
+        Each tag and ingredient counts with the weight of its relation in
+        RECIPE_SIMILARITY_WEIGHTS, the shared ones divided by all of them.
+        """
+        shared = Value(0)
+        union = Value(0)
+        for ids_field, field_name in self.model.LINK_ID_FIELDS.items():
+            weight = settings.RECIPE_SIMILARITY_WEIGHTS.get(field_name, 0)
+            if not weight:
+                continue
+            ids = getattr(recipe, ids_field)
+            matched = MatchedItemCount(ids_field, ids)
+            count = Func(
+                F(ids_field),
+                function="cardinality",
+                output_field=models.IntegerField(),
+            )
+            shared += weight * matched
+            union += weight * (len(ids) + count - matched)
+
+        return ExpressionWrapper(
+            Cast(shared, models.FloatField()) / NullIf(union, 0),
+            output_field=models.FloatField(),
+        )
+
+    def with_stale_link_ids(self, **filters):
+        """Return the matching recipes whose ID arrays miss link changes."""
+        actual = {
+            f"actual_{ids_field}": self.get_linked_ids(field_name)
+            for ids_field, field_name in self.model.LINK_ID_FIELDS.items()
+        }
+
+        return self.filter(**filters).annotate(**actual).exclude(**{
+            ids_field: F(f"actual_{ids_field}")
+            for ids_field in self.model.LINK_ID_FIELDS
+        })
+
+    def sync_link_ids(self, **filters):
+        """Rewrite the stale ID arrays and return how many recipes had one.
+
+        The arrays of every matching recipe are compared with the links
+        and rewritten in one UPDATE.
+        """
+        return self.with_stale_link_ids(**filters).update(**{
+            ids_field: self.get_linked_ids(field_name)
+            for ids_field, field_name in self.model.LINK_ID_FIELDS.items()
+        })
+
+
 class User(AbstractBaseUser, PermissionsMixin):
     """User in the system."""
 
@@ -86,10 +300,67 @@ class Recipe(models.Model):
     tags = models.ManyToManyField("Tag")
     ingredients = models.ManyToManyField("Ingredient")
     image = models.ImageField(null=True, upload_to=recipe_image_file_path)
+    # Sorted IDs of the linked tags and ingredients, so the filters check
+    # one row instead of joining the links. Kept in sync by the link
+    # signals and the bulk writer.
+    tag_ids = ArrayField(
+        models.BigIntegerField(), default=list, blank=True, editable=False
+    )
+    ingredient_ids = ArrayField(
+        models.BigIntegerField(), default=list, blank=True, editable=False
+    )
+    # Weighted title and description lexemes, kept up to date by a
+    # database trigger so bulk writes are covered too.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Recipes are always listed per user, newest first.
+            models.Index(fields=["user", "-id"], name="recipe_user_id_idx"),
+            # The orderings of the list, scanned backwards for descending
+            # ones, and the range filters on price and time.
+            models.Index(
+                fields=["user", "price", "id"], name="recipe_user_price_idx"
+            ),
+            models.Index(
+                fields=["user", "time_minutes", "id"],
+                name="recipe_user_time_idx",
+            ),
+            models.Index(
+                fields=["user", "title", "id"], name="recipe_user_title_idx"
+            ),
+            GinIndex(fields=["search_vector"], name="recipe_search_idx"),
+            # Any (&&) and all (@>) matches of the tag and ingredient IDs.
+            GinIndex(fields=["tag_ids"], name="recipe_tag_ids_idx"),
+            GinIndex(
+                fields=["ingredient_ids"], name="recipe_ingredient_ids_idx"
+            ),
+        ]
+
+    # ID array fields and the relations they mirror.
+    LINK_ID_FIELDS = {"tag_ids": "tags", "ingredient_ids": "ingredients"}
+
+    objects = RecipeManager()
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        """Save the recipe, leaving the ID arrays of saved ones alone.
+
+        The link signals update the arrays in the database, so the values
+        of an instance may be stale by the time it's saved again.
+        """
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in deferred
+                and field.name not in self.LINK_ID_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
 
 class Tag(models.Model):
     """Tag object for filtering recipes."""
@@ -100,6 +371,31 @@ class Tag(models.Model):
         on_delete=models.CASCADE,
     )
 
+    # Number of recipes linked to the tag, kept up to date on writes.
+    recipe_count = models.IntegerField(default=0, editable=False)
+
+    objects = RecipeAttrManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "name"], name="unique_tag_per_user"
+            ),
+        ]
+        indexes = [
+            # Used tags and the most used ones, per user.
+            models.Index(
+                fields=["user", "recipe_count", "name"],
+                name="tag_user_count_idx",
+            ),
+            # Name autocomplete, by prefix or similarity.
+            GinIndex(
+                fields=["name"],
+                name="tag_name_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -113,5 +409,30 @@ class Ingredient(models.Model):
         on_delete=models.CASCADE,
     )
 
+    # Number of recipes linked to the ingredient, kept up to date on writes.
+    recipe_count = models.IntegerField(default=0, editable=False)
+
+    objects = RecipeAttrManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "name"], name="unique_ingredient_per_user"
+            ),
+        ]
+        indexes = [
+            # Used ingredients and the most used ones, per user.
+            models.Index(
+                fields=["user", "recipe_count", "name"],
+                name="ingredient_user_count_idx",
+            ),
+            # Name autocomplete, by prefix or similarity.
+            GinIndex(
+                fields=["name"],
+                name="ingredient_name_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ]
+
     def __str__(self):
         return self.name
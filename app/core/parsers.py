@@ -0,0 +1,26 @@
+"""
+Parsers for the APIs.
+"""
+import orjson
+
+from django.conf import settings
+
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+
+
+class ORJSONParser(parsers.JSONParser):
+    """Parse JSON request bodies with orjson."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            data = stream.read()
+            if encoding.lower().replace("-", "") != "utf8":
+                data = data.decode(encoding)
+            return orjson.loads(data)
+        except (
+            orjson.JSONDecodeError, UnicodeDecodeError, LookupError
+        ) as exc:
+            raise ParseError(f"JSON parse error - {exc}")
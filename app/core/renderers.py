@@ -0,0 +1,58 @@
+"""
+Renderers for the APIs.
+"""
+import orjson
+
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    """Render JSON with orjson.
+
+    The output matches DRF's compact JSON renderer: UTF-8 without escaped
+    non ASCII characters, and types orjson lacks, such as lazy strings
+    and decimals, are encoded like DRF encodes them.
+    """
+
+    options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        renderer_context = renderer_context or {}
+        # orjson can't indent freely, indented output stays with DRF.
+        if self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(
+            data, default=JSONEncoder().default, option=self.options
+        )
+        # We escape the separators JavaScript doesn't allow in strings,
+        # like DRF does.
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+
+        return ret
+
+
+class NDJSONRenderer(ORJSONRenderer):
+    """Render newline delimited JSON, one line per item of a list."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, list):
+            return b"".join(self.render_lines(data))
+        # Single objects, such as errors, make a one line document.
+        return super().render(
+            data, accepted_media_type, renderer_context
+        ) + b"\n"
+
+    def render_lines(self, items):
+        """Yield the line of each item, for streaming responses."""
+        for item in items:
+            yield super().render(item) + b"\n"
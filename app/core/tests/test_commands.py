@@ -1,13 +1,22 @@
 """
 Test custom Django management commands.
 """
+import json
+import os
+import tempfile
+from io import StringIO
 from unittest.mock import patch
 
 from psycopg2 import OperationalError as Psycopg2Error
 
+from django.contrib.auth import get_user_model
 from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase
+
+from core.models import Recipe, Tag, Ingredient
+from recipe.bulk import RecipeBulkWriter
 
 
 @patch("core.management.commands.wait_for_db.Command.check")
@@ -37,3 +46,157 @@ class CommandTests(SimpleTestCase):
         # (2 Psycopg2 + 3 Operational Errors + True statement = 6)
         self.assertEqual(patched_check.call_count, 6)
         patched_check.assert_called_with(databases=["default"])
+
+
+class BenchmarkCommandTests(TestCase):
+    """Test the benchmark data and query plan commands."""
+
+    def test_seed_recipes(self):
+        """Test seeding creates linked recipes for every user."""
+        call_command(
+            "seed_recipes",
+            users=2,
+            recipes=25,
+            tags=4,
+            ingredients=6,
+            batch_size=10,
+            stdout=StringIO(),
+        )
+
+        self.assertEqual(get_user_model().objects.count(), 2)
+        self.assertEqual(Recipe.objects.count(), 25)
+        self.assertEqual(Tag.objects.count(), 8)
+        self.assertEqual(Ingredient.objects.count(), 12)
+        self.assertEqual(Recipe.tags.through.objects.count(), 25 * 3)
+        self.assertEqual(Recipe.ingredients.through.objects.count(), 25 * 6)
+        for recipe in Recipe.objects.all():
+            for tag in recipe.tags.all():
+                self.assertEqual(tag.user_id, recipe.user_id)
+        for tag in Tag.objects.all():
+            self.assertEqual(tag.recipe_count, tag.recipe_set.count())
+        self.assertFalse(Recipe.objects.with_stale_link_ids().exists())
+
+    def test_explain_recipe_queries(self):
+        """Test the query plans are printed for each query."""
+        call_command("seed_recipes", users=1, recipes=5, stdout=StringIO())
+        out = StringIO()
+
+        call_command("explain_recipe_queries", stdout=out)
+
+        output = out.getvalue()
+        self.assertIn("Recipe list:", output)
+        self.assertIn("Assigned ingredients:", output)
+        self.assertIn("Execution Time", output)
+
+    def test_benchmark_recipe_reads(self):
+        """Test both read paths are timed for each size."""
+        call_command("seed_recipes", users=1, recipes=5, stdout=StringIO())
+        out = StringIO()
+
+        call_command(
+            "benchmark_recipe_reads", sizes=[3, 5], repeat=1, stdout=out
+        )
+
+        output = out.getvalue()
+        self.assertIn("3 recipes: serializer", output)
+        self.assertIn("5 recipes: serializer", output)
+
+    def test_repair_recipe_counts(self):
+        """Test wrong recipe counts are recomputed from the links."""
+        call_command("seed_recipes", users=1, recipes=5, stdout=StringIO())
+        Tag.objects.update(recipe_count=99)
+        out = StringIO()
+
+        call_command("repair_recipe_counts", stdout=out)
+
+        self.assertIn(f"Repaired {Tag.objects.count()} tags.", out.getvalue())
+        self.assertIn("Repaired 0 ingredients.", out.getvalue())
+        for tag in Tag.objects.all():
+            self.assertEqual(tag.recipe_count, tag.recipe_set.count())
+
+    def test_sync_recipe_link_ids(self):
+        """Test stale ID arrays are reported and rewritten from the links."""
+        call_command("seed_recipes", users=1, recipes=5, stdout=StringIO())
+        Recipe.objects.filter(id__lte=Recipe.objects.first().id).update(
+            tag_ids=[]
+        )
+        out = StringIO()
+
+        with self.assertRaisesMessage(CommandError, "1 recipes have stale"):
+            call_command("sync_recipe_link_ids", check=True, stdout=out)
+        call_command("sync_recipe_link_ids", stdout=out)
+        call_command("sync_recipe_link_ids", check=True, stdout=out)
+
+        self.assertIn("Synced 1 recipes.", out.getvalue())
+        for recipe in Recipe.objects.all():
+            self.assertEqual(
+                recipe.tag_ids,
+                sorted(recipe.tags.values_list("id", flat=True)),
+            )
+
+
+class ImportRecipesCommandTests(TestCase):
+    """Test the recipe import command."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "user@example.com",
+            "testpass123",
+        )
+        rows = [
+            {"title": f"Recipe {n}", "time_minutes": 5, "price": "1.00"}
+            for n in range(5)
+        ]
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".ndjson", delete=False
+        ) as import_file:
+            import_file.write("\n".join(json.dumps(row) for row in rows))
+        self.path = import_file.name
+        self.addCleanup(os.remove, self.path)
+
+    def test_import_in_chunks(self):
+        """Test every chunk is committed and reported."""
+        out = StringIO()
+
+        call_command(
+            "import_recipes",
+            self.path,
+            email=self.user.email,
+            chunk_size=2,
+            stdout=out,
+        )
+
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 5)
+        self.assertIn("Committed up to line 4: 4 created", out.getvalue())
+        self.assertIn("Imported 5 recipes, 0 rows failed.", out.getvalue())
+
+    def test_interrupted_import_resumes(self):
+        """Test a failed import reports where to resume."""
+        create = RecipeBulkWriter.create
+        calls = []
+
+        def fail_second_chunk(writer, items):
+            calls.append(items)
+            if len(calls) == 2:
+                raise OperationalError("connection lost")
+            return create(writer, items)
+
+        with patch.object(RecipeBulkWriter, "create", fail_second_chunk):
+            with self.assertRaisesMessage(CommandError, "--start-line 2"):
+                call_command(
+                    "import_recipes",
+                    self.path,
+                    email=self.user.email,
+                    chunk_size=2,
+                    stdout=StringIO(),
+                )
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 2)
+
+        call_command(
+            "import_recipes",
+            self.path,
+            email=self.user.email,
+            start_line=2,
+            stdout=StringIO(),
+        )
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 5)
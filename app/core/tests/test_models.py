@@ -7,6 +7,7 @@ from decimal import Decimal
 
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection
 
 from core import models
 
@@ -104,6 +105,37 @@ class ModelTests(TestCase):
 
         self.assertEqual(str(ingredient), ingredient.name)
 
+    def test_tag_names_unique_per_user(self):
+        """Test a user can't have two tags with the same name."""
+        user = create_user()
+        other_user = create_user(email="other@example.com")
+        models.Tag.objects.create(user=user, name="Tag")
+        models.Tag.objects.create(user=other_user, name="Tag")
+
+        with self.assertRaises(IntegrityError):
+            models.Tag.objects.create(user=user, name="Tag")
+
+    def test_get_or_create_many(self):
+        """Test fetching and creating ingredients by name in bulk."""
+        user = create_user()
+        salt = models.Ingredient.objects.create(user=user, name="Salt")
+
+        with self.assertNumQueries(3):
+            ids = models.Ingredient.objects.get_or_create_many(
+                user, ["Salt", "Pepper", "Pepper", "Oil"]
+            )
+
+        self.assertEqual(list(ids), ["Salt", "Pepper", "Oil"])
+        self.assertEqual(ids["Salt"], salt.id)
+        self.assertEqual(
+            models.Ingredient.objects.filter(user=user).count(), 3
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                models.Ingredient.objects.get_or_create_many(user, ["Oil"]),
+                {"Oil": ids["Oil"]},
+            )
+
     @patch("core.models.uuid.uuid4")
     def test_recipe_file_name_uuid(self, mock_uuid):
         """Test generating image path."""
@@ -112,3 +144,21 @@ class ModelTests(TestCase):
         file_path = models.recipe_image_file_path(None, "example.jpg")
 
         self.assertEqual(file_path, f"uploads/recipe/{uuid}.jpg")
+
+    def test_link_tables_reverse_indexes(self):
+        """Test each link column leads one index, not a redundant pair."""
+        for field_name, column in [
+            ("tags", "tag_id"), ("ingredients", "ingredient_id")
+        ]:
+            through = models.Recipe._meta.get_field(field_name).remote_field
+            with connection.cursor() as cursor:
+                constraints = connection.introspection.get_constraints(
+                    cursor, through.through._meta.db_table
+                )
+            leading = [
+                constraint["columns"]
+                for constraint in constraints.values()
+                if constraint["index"] and constraint["columns"][0] == column
+            ]
+
+            self.assertEqual(leading, [[column, "recipe_id"]], field_name)
@@ -0,0 +1,101 @@
+"""
+Tests for the JSON renderer and parser.
+"""
+import io
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    """Test the orjson renderer."""
+
+    def test_output_matches_drf(self):
+        """Test the output is byte for byte DRF's compact JSON."""
+        data = {
+            "results": [
+                {
+                    "id": 1,
+                    "title": 'Crème brûlée "au four"',
+                    "price": "5.25",
+                    "tags": [{"id": 2, "name": "Dessert"}],
+                },
+            ],
+            "amount": Decimal("1.50"),
+            "birthday": date(1990, 5, 17),
+            "created": datetime(2026, 10, 18, 12, 30, 15, 123456),
+            "uuid": uuid.UUID(int=1),
+            "detail": gettext_lazy("Not found."),
+            "separators": "a\u2028b\u2029c",
+            1: None,
+        }
+
+        self.assertEqual(
+            ORJSONRenderer().render(data),
+            JSONRenderer().render(data),
+        )
+
+    def test_none_renders_empty(self):
+        """Test empty responses have no body."""
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+    def test_indent_requested(self):
+        """Test indented output is still available."""
+        res = ORJSONRenderer().render(
+            {"id": 1}, "application/json; indent=4"
+        )
+
+        self.assertEqual(res, b'{\n    "id": 1\n}')
+
+
+class ORJSONParserTests(SimpleTestCase):
+    """Test the orjson parser."""
+
+    def test_parse(self):
+        """Test JSON bodies are parsed."""
+        stream = io.BytesIO('{"name": "Crème", "n": [1, 2.5]}'.encode())
+
+        data = ORJSONParser().parse(stream)
+
+        self.assertEqual(data, {"name": "Crème", "n": [1, 2.5]})
+
+    def test_invalid_json_rejected(self):
+        """Test invalid bodies raise a parse error."""
+        for body in [b"{", b'{"n": NaN}', b"\xff"]:
+            with self.assertRaises(ParseError):
+                ORJSONParser().parse(io.BytesIO(body))
+
+
+class RendererNegotiationTests(TestCase):
+    """Test the renderers the API offers."""
+
+    def test_browsable_api_disabled(self):
+        """Test HTML isn't rendered unless the browsable API is enabled."""
+        res = APIClient().get(
+            reverse("user:create"), HTTP_ACCEPT="text/html"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_406_NOT_ACCEPTABLE)
+
+    def test_json_request_parsed(self):
+        """Test JSON request bodies reach the views."""
+        res = APIClient().post(
+            reverse("user:create"),
+            {"email": "test@example.com", "password": "testpass123"},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(list(res.data), ["name"])
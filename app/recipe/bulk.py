@@ -0,0 +1,211 @@
+"""
+Bulk writes for the recipe APIs.
+"""
+from django.db import transaction
+from django.db.models import Count
+from django.utils.translation import gettext as _
+
+from rest_framework import serializers
+
+from core.models import Recipe, Tag, Ingredient
+from recipe.cache import bump_data_version
+from recipe.signals import recipe_counts_suspended
+
+
+class RecipeBulkWriter:
+    """Write many recipes of a user with a fixed number of queries."""
+
+    related_models = {"tags": Tag, "ingredients": Ingredient}
+
+    def __init__(self, user):
+        self.user = user
+
+    @transaction.atomic
+    def write(self, operations):
+        """Apply validated bulk operations and return per-item results."""
+        targets = self._lock_targets(operations)
+        creates = [op for op in operations if op["op"] == "create"]
+        updates = [op for op in operations if op["op"] == "update"]
+        deletes = [op for op in operations if op["op"] == "delete"]
+
+        created = self.create([op["data"] for op in creates])
+        self.update([(targets[op["id"]], op["data"]) for op in updates])
+        self.delete([targets[op["id"]] for op in deletes])
+
+        created_ids = iter(recipe.id for recipe in created)
+        results = []
+        for op in operations:
+            if op["op"] == "create":
+                results.append({"op": op["op"], "id": next(created_ids)})
+            else:
+                results.append({"op": op["op"], "id": op["id"]})
+
+        return results
+
+    def create(self, items):
+        """Create recipes from validated data and return them."""
+        attr_ids = self._get_or_create_attrs(items)
+        recipes = Recipe.objects.bulk_create([
+            Recipe(
+                user=self.user,
+                **self._get_fields(data),
+                **self._get_link_ids(data, attr_ids),
+            )
+            for data in items
+        ])
+        self._write_links(recipes, items, attr_ids, replace=False)
+        # Bulk writes don't send model signals, so we invalidate here.
+        bump_data_version(self.user.id)
+
+        return recipes
+
+    def update(self, changes):
+        """Apply validated partial data to (recipe, data) pairs."""
+        if not changes:
+            return
+        recipes = [recipe for recipe, data in changes]
+        items = [data for recipe, data in changes]
+        attr_ids = self._get_or_create_attrs(items)
+
+        fields = set()
+        for recipe, data in changes:
+            values = {
+                **self._get_fields(data),
+                **self._get_link_ids(data, attr_ids),
+            }
+            for attr, value in values.items():
+                setattr(recipe, attr, value)
+                fields.add(attr)
+        if fields:
+            Recipe.objects.bulk_update(recipes, sorted(fields))
+        self._write_links(recipes, items, attr_ids, replace=True)
+        bump_data_version(self.user.id)
+
+    def delete(self, recipes):
+        """Delete the given recipes."""
+        if not recipes:
+            return
+        ids = [recipe.id for recipe in recipes]
+        # We count the removed links per tag and ingredient with one
+        # query each, instead of one update per recipe and relation.
+        deltas = {}
+        for field_name, model in self.related_models.items():
+            through = Recipe._meta.get_field(field_name).remote_field.through
+            related_id = f"{model._meta.model_name}_id"
+            deltas[model] = {
+                attr_id: -count
+                for attr_id, count in through.objects.filter(
+                    recipe_id__in=ids
+                ).values(related_id).annotate(
+                    count=Count("id")
+                ).values_list(related_id, "count")
+            }
+        with recipe_counts_suspended():
+            Recipe.objects.filter(id__in=ids).delete()
+        for model, model_deltas in deltas.items():
+            model.objects.add_recipe_counts(model_deltas)
+
+    def _lock_targets(self, operations):
+        """Lock the recipes to update or delete, checking they exist."""
+        ids = [op["id"] for op in operations if op["op"] != "create"]
+        targets = Recipe.objects.select_for_update().filter(
+            user=self.user, id__in=ids,
+        ).in_bulk()
+
+        errors = []
+        seen = set()
+        for op in operations:
+            error = {}
+            if op["op"] != "create":
+                if op["id"] not in targets:
+                    error["id"] = [_("Recipe not found.")]
+                elif op["id"] in seen:
+                    error["id"] = [_("Recipe appears more than once.")]
+                seen.add(op["id"])
+            errors.append(error)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+        return targets
+
+    def _get_fields(self, data):
+        """Return the recipe columns of validated data."""
+        return {
+            attr: value for attr, value in data.items()
+            if attr not in self.related_models
+        }
+
+    def _get_link_ids(self, data, attr_ids):
+        """Return the ID arrays of the relations given in validated data.
+
+        Given relations replace the links, so the arrays are written with
+        the recipe columns instead of being synced with the links.
+        """
+        return {
+            ids_field: sorted({
+                attr_ids[field_name][attr["name"]]
+                for attr in data[field_name]
+            })
+            for ids_field, field_name in Recipe.LINK_ID_FIELDS.items()
+            if field_name in data
+        }
+
+    def _get_or_create_attrs(self, items):
+        """Resolve every tag and ingredient name used by the items."""
+        attr_ids = {}
+        for field_name, model in self.related_models.items():
+            names = [
+                attr["name"]
+                for data in items
+                for attr in data.get(field_name, [])
+            ]
+            attr_ids[field_name] = model.objects.get_or_create_many(
+                self.user, names
+            )
+
+        return attr_ids
+
+    def _write_links(self, recipes, items, attr_ids, replace):
+        """Link recipes to their tags and ingredients in bulk."""
+        for field_name in self.related_models:
+            field = Recipe._meta.get_field(field_name)
+            through = field.remote_field.through
+            related_id = f"{field.m2m_reverse_field_name()}_id"
+            changed = [
+                (recipe, data[field_name])
+                for recipe, data in zip(recipes, items)
+                if field_name in data
+            ]
+            if not changed:
+                continue
+            wanted = {
+                (recipe.id, attr_ids[field_name][attr["name"]])
+                for recipe, attrs in changed
+                for attr in attrs
+            }
+
+            stale = []
+            # Bulk writes send no m2m_changed signals, so we count the
+            # changed links per tag or ingredient here.
+            deltas = {}
+            if replace:
+                # We only touch the links that changed, like set() does.
+                existing = through.objects.filter(
+                    recipe_id__in=[recipe.id for recipe, attrs in changed]
+                ).values_list("id", "recipe_id", related_id)
+                for link_id, recipe_id, attr_id in existing:
+                    if (recipe_id, attr_id) in wanted:
+                        wanted.remove((recipe_id, attr_id))
+                    else:
+                        stale.append(link_id)
+                        deltas[attr_id] = deltas.get(attr_id, 0) - 1
+            if stale:
+                through.objects.filter(id__in=stale).delete()
+            if wanted:
+                through.objects.bulk_create([
+                    through(recipe_id=recipe_id, **{related_id: attr_id})
+                    for recipe_id, attr_id in sorted(wanted)
+                ])
+                for recipe_id, attr_id in wanted:
+                    deltas[attr_id] = deltas.get(attr_id, 0) + 1
+            self.related_models[field_name].objects.add_recipe_counts(deltas)
@@ -0,0 +1,233 @@
+"""
+Response caching for the recipe APIs.
+"""
+import hashlib
+import threading
+import uuid
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.http import parse_etags, quote_etag
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import exceptions, status
+from rest_framework.response import Response
+
+
+def get_cache():
+    """Return the cache backing the recipe API responses."""
+    return caches[settings.RECIPE_CACHE_ALIAS]
+
+
+def _version_key(user_id):
+    return f"recipe:version:{user_id}"
+
+
+def get_data_version(user_id):
+    """Return the current version of a user's recipe data."""
+    cache = get_cache()
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        # Versions are random, so a counter lost to eviction can never
+        # come back to a version that has cached responses.
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+
+    return version
+
+
+def bump_data_version(user_id):
+    """Invalidate every cached response of a user."""
+    key = _version_key(user_id)
+
+    def bump():
+        get_cache().set(key, uuid.uuid4().hex, timeout=None)
+
+    bump()
+    # We bump again once the transaction commits, otherwise a request
+    # reading the new version before the commit could cache old data.
+    transaction.on_commit(bump)
+
+
+class CacheStats:
+    """Hit and miss counters of the response cache."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def as_dict(self):
+        """Return the counters and the hit ratio."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+response_cache_stats = CacheStats()
+
+
+def _get_params(request):
+    """Return the query string of a request with sorted parameters."""
+    return urlencode(sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+    ))
+
+
+def get_response_cache_key(request, view_name):
+    """Return the cache key of a response for the user's data version."""
+    # Hashing keeps the key short enough for any cache backend.
+    digest = hashlib.sha256(
+        f"{request.get_host()}?{_get_params(request)}".encode()
+    ).hexdigest()
+    user_id = request.user.id
+
+    return (
+        f"recipe:response:{user_id}:{get_data_version(user_id)}:"
+        f"{view_name}:{digest}"
+    )
+
+
+class CachedListMixin:
+    """Serve list responses from the cache until the user's data changes."""
+
+    def list(self, request, *args, **kwargs):
+        cache = get_cache()
+        key = get_response_cache_key(request, f"{self.basename}-list")
+        data = cache.get(key)
+        response_cache_stats.record(hit=data is not None)
+        if data is not None:
+            return Response(data)
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.RECIPE_CACHE_TIMEOUT)
+
+        return response
+
+
+def get_etag(request, params=True):
+    """Return a strong ETag of a response for the user's data version.
+
+    The ETag changes with any change to the user's data, so it is computed
+    without loading or rendering anything.
+    """
+    query = _get_params(request) if params else ""
+    digest = hashlib.sha256(f"{request.path}?{query}".encode()).hexdigest()
+
+    return quote_etag(f"{get_data_version(request.user.id)}-{digest[:16]}")
+
+
+class NotModified(exceptions.APIException):
+    status_code = status.HTTP_304_NOT_MODIFIED
+
+
+class PreconditionFailed(exceptions.APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = _("The resource was changed by another request.")
+    default_code = "precondition_failed"
+
+
+class ConditionalRequestMixin:
+    """Answer If-None-Match on reads and If-Match on updates with ETags."""
+
+    etag = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in ("GET", "HEAD") and self.action in (
+            "list",
+            "retrieve",
+        ):
+            self.etag = get_etag(request)
+            if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+            if if_none_match and self._etag_matches(
+                if_none_match,
+                self.etag,
+                weak=True,
+            ):
+                # We answer before the handler runs, so nothing is loaded
+                # or serialized.
+                raise NotModified()
+
+    def update(self, request, *args, **kwargs):
+        response = super().update(request, *args, **kwargs)
+        # The update changed the data version, so the response carries the
+        # ETag the next If-Match has to send, the one a detail GET returns.
+        self.etag = get_etag(request, params=False)
+
+        return response
+
+    def perform_update(self, serializer):
+        if_match = self.request.META.get("HTTP_IF_MATCH")
+        if if_match is None:
+            return super().perform_update(serializer)
+
+        with transaction.atomic():
+            # Locking the row serializes concurrent conditional updates,
+            # so only the first one still sees a matching version.
+            instance = serializer.instance
+            list(
+                type(instance).objects
+                .select_for_update()
+                .filter(pk=instance.pk)
+                .values_list("pk")
+            )
+            # If-Match takes the ETag of the plain detail response.
+            etag = get_etag(self.request, params=False)
+            if not self._etag_matches(if_match, etag, weak=False):
+                raise PreconditionFailed()
+            super().perform_update(serializer)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request,
+            response,
+            *args,
+            **kwargs,
+        )
+        if self.etag is not None and response.status_code in (
+            status.HTTP_200_OK,
+            status.HTTP_304_NOT_MODIFIED,
+        ):
+            response["ETag"] = self.etag
+
+        return response
+
+    @staticmethod
+    def _etag_matches(header, etag, weak):
+        etags = parse_etags(header)
+        if "*" in etags:
+            return True
+        if weak:
+            # If-None-Match compares ETags ignoring the weak marker.
+            etags = [tag[2:] if tag.startswith("W/") else tag for tag in etags]
+
+        return etag in etags
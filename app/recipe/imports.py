@@ -0,0 +1,152 @@
+"""
+Bulk imports of recipes from NDJSON and CSV files.
+"""
+import csv
+import itertools
+
+import orjson
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.translation import gettext as _
+
+from rest_framework import serializers
+
+from recipe.bulk import RecipeBulkWriter
+from recipe.serializers import RecipeDetailSerializer
+
+
+# Separator of the tag and ingredient names in a CSV cell.
+CSV_NAME_SEPARATOR = "|"
+CSV_RELATED_COLUMNS = ("tags", "ingredients")
+
+
+def read_ndjson(lines):
+    """Yield (line number, object) pairs from NDJSON byte lines.
+
+    Lines that aren't valid JSON yield None, blank lines are skipped.
+    """
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, orjson.loads(line)
+        except orjson.JSONDecodeError:
+            yield line_number, None
+
+
+def read_csv(lines):
+    """Yield (line number, object) pairs from CSV byte lines.
+
+    The header names the recipe fields, and the tags and ingredients
+    columns hold names separated by "|". Empty cells are left out. Rows
+    with lines that aren't valid UTF-8 yield None.
+    """
+    invalid_lines = set()
+
+    def decode(lines):
+        # We decode line by line, so a bad line only fails its own row.
+        # The first one may start with the BOM spreadsheets write.
+        for line_number, line in enumerate(lines, start=1):
+            encoding = "utf-8-sig" if line_number == 1 else "utf-8"
+            try:
+                yield line.decode(encoding)
+            except UnicodeDecodeError:
+                invalid_lines.add(line_number)
+                yield line.decode(encoding, errors="replace")
+
+    reader = csv.DictReader(decode(lines))
+    row_end = 0
+    for row in reader:
+        # A quoted cell can span lines, so a row covers every line read
+        # since the last one.
+        row_start, row_end = row_end + 1, reader.line_num
+        if not invalid_lines.isdisjoint(range(row_start, row_end + 1)):
+            yield row_end, None
+            continue
+        data = {}
+        for column, value in row.items():
+            if column is None or not value:
+                continue
+            if column in CSV_RELATED_COLUMNS:
+                data[column] = [
+                    {"name": name.strip()}
+                    for name in value.split(CSV_NAME_SEPARATOR)
+                    if name.strip()
+                ]
+            else:
+                data[column] = value
+        yield reader.line_num, data
+
+
+READERS = {"ndjson": read_ndjson, "csv": read_csv}
+
+
+class RecipeImporter:
+    """Import recipes for a user, committing one chunk of rows at a time.
+
+    Each chunk is validated and written with bulk inserts in its own
+    transaction, so an interrupted import can resume after the last
+    committed line. Invalid rows are skipped and reported.
+    """
+
+    def __init__(self, user, chunk_size=None):
+        self.user = user
+        self.chunk_size = chunk_size or settings.RECIPE_IMPORT_CHUNK_SIZE
+        self.writer = RecipeBulkWriter(user)
+        # Like ListSerializer, we validate every row with one serializer,
+        # so its fields are only built once.
+        self.serializer = RecipeDetailSerializer()
+
+    def run(self, rows, start_line=0, progress=None):
+        """Import (line number, object) rows following start_line.
+
+        progress is called with the result after each committed chunk.
+        """
+        result = {
+            "created": 0,
+            "failed": 0,
+            "errors": [],
+            "last_line": start_line,
+        }
+        rows = (
+            (line, data) for line, data in rows if line > start_line
+        )
+        while True:
+            chunk = list(itertools.islice(rows, self.chunk_size))
+            if not chunk:
+                return result
+            self._import_chunk(chunk, result)
+            if progress is not None:
+                progress(result)
+
+    def _import_chunk(self, chunk, result):
+        """Validate and write one chunk of rows."""
+        items = []
+        for line, data in chunk:
+            validated_data, errors = self._validate(data)
+            if errors:
+                result["failed"] += 1
+                # We keep a bounded sample of the errors.
+                if len(result["errors"]) < settings.RECIPE_IMPORT_MAX_ERRORS:
+                    result["errors"].append({"line": line, "errors": errors})
+            else:
+                items.append(validated_data)
+
+        if items:
+            with transaction.atomic():
+                self.writer.create(items)
+        result["created"] += len(items)
+        result["last_line"] = chunk[-1][0]
+
+    def _validate(self, data):
+        """Return the (validated data, errors) of a row."""
+        if data is None:
+            msg = _("Invalid row, it isn't valid UTF-8 encoded JSON or CSV.")
+            return None, {"non_field_errors": [msg]}
+        if not isinstance(data, dict):
+            return None, {"non_field_errors": [_("Invalid JSON object.")]}
+        try:
+            return self.serializer.run_validation(data), None
+        except serializers.ValidationError as exc:
+            return None, exc.detail
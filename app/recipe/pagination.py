@@ -0,0 +1,180 @@
+"""
+Pagination for the recipe APIs.
+"""
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from recipe.serializers import LimitSerializer
+
+
+def get_limit(request, default, maximum):
+    """Return the validated ?limit= of a request, capped to the maximum."""
+    serializer = LimitSerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+
+    return min(serializer.validated_data.get("limit", default), maximum)
+
+
+class KeysetPagination(BasePagination):
+    """Paginate by seeking past the last row of the previous page.
+
+    Unlike OFFSET pagination, each page is a range scan starting right
+    after the cursor, so deep pages cost the same as the first one.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    # Ordering the pages are keyed on, the last field has to be unique.
+    ordering = ("-id",)
+    invalid_cursor_message = _("Invalid cursor.")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Return the page of results following the request cursor."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(view)
+        queryset = queryset.order_by(*self.ordering)
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            # The lookups convert the cursor values to their fields' types
+            # when the filter is built, so tampered values fail here.
+            try:
+                queryset = queryset.filter(self.get_seek_filter(position))
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        # We fetch one extra row to know whether there's a next page.
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        return self.page
+
+    def get_paginated_response(self, data):
+        """Wrap the page results with a link to the next page."""
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+    def get_page_size(self, request):
+        """Return the requested page size, capped to the maximum."""
+        page_size = settings.RECIPE_PAGE_SIZE
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            requested = 0
+        if requested > 0:
+            page_size = requested
+
+        return min(page_size, settings.RECIPE_MAX_PAGE_SIZE)
+
+    def get_ordering(self, view):
+        """Return the ordering of the pages.
+
+        Views can key the pages on other values, e.g. a search rank, by
+        returning an ordering from get_keyset_ordering().
+        """
+        get_keyset_ordering = getattr(view, "get_keyset_ordering", None)
+        if get_keyset_ordering is not None:
+            return get_keyset_ordering() or self.ordering
+
+        return self.ordering
+
+    def get_next_link(self):
+        """Return the URL of the next page, if there is one."""
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        position = [
+            self._get_value(last, field.lstrip("-")) for field in self.ordering
+        ]
+        url = self.request.build_absolute_uri()
+
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(position)
+        )
+
+    def get_seek_filter(self, position):
+        """Return the filter matching the rows after the given position."""
+        # For an ordering (a, b) this builds: a > x OR (a = x AND b > y),
+        # flipping the comparison for descending fields.
+        seek = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            seek |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        if len(self.ordering) > 1:
+            # A bound on the first field alone can start an index range
+            # scan, the ORs are then only checked on the rows it returns.
+            field = self.ordering[0]
+            lookup = "lte" if field.startswith("-") else "gte"
+            seek &= Q(**{f"{field.lstrip('-')}__{lookup}": position[0]})
+
+        return seek
+
+    def encode_cursor(self, position):
+        """Return an opaque cursor for the given ordering values."""
+        data = json.dumps(position, cls=DjangoJSONEncoder)
+
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    def decode_cursor(self, request):
+        """Return the ordering values stored in the request cursor."""
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or (
+            len(position) != len(self.ordering)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+        return position
+
+    def _get_value(self, item, name):
+        if isinstance(item, dict):
+            return item[name]
+        return getattr(item, name)
@@ -1,12 +1,33 @@
 """
 Serializers for recipe APIs.
 """
+from django.conf import settings
+from django.db import transaction
+from django.utils.translation import gettext as _
+
 from rest_framework import serializers
 
 from core.models import Recipe, Tag, Ingredient
 
 
-class IngredientSerializer(serializers.ModelSerializer):
+class BaseRecipeAttrSerializer(serializers.ModelSerializer):
+    """Base serializer for recipe attributes."""
+
+    def validate_name(self, value):
+        """Check a renamed object doesn't clash with an existing one."""
+        # Nested serializers have no instance, there the name selects
+        # the existing object to link instead.
+        if self.instance is not None:
+            clashes = type(self.instance).objects.filter(
+                user=self.instance.user_id, name=value,
+            ).exclude(id=self.instance.id)
+            if clashes.exists():
+                msg = _("You already have one with this name.")
+                raise serializers.ValidationError(msg, code="unique")
+        return value
+
+
+class IngredientSerializer(BaseRecipeAttrSerializer):
     """Serializer for ingredients."""
 
     class Meta:
@@ -15,7 +36,7 @@ class IngredientSerializer(serializers.ModelSerializer):
         read_only_fields = ["id"]
 
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(BaseRecipeAttrSerializer):
     """Serializer for tags."""
 
     class Meta:
@@ -24,7 +45,35 @@ class TagSerializer(serializers.ModelSerializer):
         read_only_fields = ["id"]
 
 
-class RecipeSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """Serializer that renders only the fields it is given."""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class IngredientCountSerializer(IngredientSerializer):
+    """Serializer for ingredients with the number of recipes using them."""
+
+    recipe_count = serializers.IntegerField(read_only=True)
+
+    class Meta(IngredientSerializer.Meta):
+        fields = IngredientSerializer.Meta.fields + ["recipe_count"]
+
+
+class TagCountSerializer(TagSerializer):
+    """Serializer for tags with the number of recipes using them."""
+
+    recipe_count = serializers.IntegerField(read_only=True)
+
+    class Meta(TagSerializer.Meta):
+        fields = TagSerializer.Meta.fields + ["recipe_count"]
+
+
+class RecipeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for recipes."""
 
     tags = TagSerializer(many=True, required=False)
@@ -43,24 +92,25 @@ class RecipeSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id"]
 
-    def _get_or_create_tags(self, tags, recipe):
+    def _get_or_create_tags(self, tags):
         """Handle getting or creating tags as needed."""
         auth_user = self.context["request"].user
-        for tag in tags:
-            # get_or_create is a Model Manager helper function which will get the
-            # value if it exists for the user and Tag.name that's provided, or create one.
-            tag_obj, created = Tag.objects.get_or_create(user=auth_user, **tag)
-            recipe.tags.add(tag_obj)
+        # We fetch and create all the tags in a few queries instead of
+        # one get_or_create per tag.
+        tag_ids = Tag.objects.get_or_create_many(
+            auth_user, [tag["name"] for tag in tags]
+        )
+        return list(tag_ids.values())
 
-    def _get_or_create_ingredients(self, ingredients, recipe):
+    def _get_or_create_ingredients(self, ingredients):
         """Handle getting or creating ingredients as needed."""
         auth_user = self.context["request"].user
-        for ingredient in ingredients:
-            ingredient_obj, created = Ingredient.objects.get_or_create(
-                user=auth_user, **ingredient
-            )
-            recipe.ingredients.add(ingredient_obj)
+        ingredient_ids = Ingredient.objects.get_or_create_many(
+            auth_user, [ingredient["name"] for ingredient in ingredients]
+        )
+        return list(ingredient_ids.values())
 
+    @transaction.atomic
     def create(self, validated_data):
         """Create a recipe."""
         # If tags exist in validated data, we will remove it, and
@@ -70,21 +120,24 @@ class RecipeSerializer(serializers.ModelSerializer):
         ingredients = validated_data.pop("ingredients", [])
         # Django expects tags to be created separately, so we create custom logic.
         recipe = Recipe.objects.create(**validated_data)
-        self._get_or_create_tags(tags, recipe)
-        self._get_or_create_ingredients(ingredients, recipe)
+        recipe.tags.add(*self._get_or_create_tags(tags))
+        recipe.ingredients.add(*self._get_or_create_ingredients(ingredients))
 
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         """Update recipe."""
         tags = validated_data.pop("tags", None)
         ingredients = validated_data.pop("ingredients", None)
+        # set() compares against the current links and only deletes and
+        # inserts the rows that changed.
         if tags is not None:
-            instance.tags.clear()
-            self._get_or_create_tags(tags, instance)
+            instance.tags.set(self._get_or_create_tags(tags))
         if ingredients is not None:
-            instance.ingredients.clear()
-            self._get_or_create_ingredients(ingredients, instance)
+            instance.ingredients.set(
+                self._get_or_create_ingredients(ingredients)
+            )
 
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
@@ -93,6 +146,30 @@ class RecipeSerializer(serializers.ModelSerializer):
         return instance
 
 
+class RecipePantryMatchSerializer(RecipeSerializer):
+    """Serializer for recipes matching a pantry."""
+
+    missing_count = serializers.IntegerField(read_only=True)
+    missing_ingredients = serializers.ListField(
+        child=serializers.IntegerField(), read_only=True
+    )
+
+    class Meta(RecipeSerializer.Meta):
+        fields = RecipeSerializer.Meta.fields + [
+            "missing_count",
+            "missing_ingredients",
+        ]
+
+
+class RecipeSimilarSerializer(RecipeSerializer):
+    """Serializer for recipes similar to another one."""
+
+    similarity = serializers.FloatField(read_only=True)
+
+    class Meta(RecipeSerializer.Meta):
+        fields = RecipeSerializer.Meta.fields + ["similarity"]
+
+
 # We are using RecipeSerializer as the base class of RecipeDetailSerializer,
 # since RecipeDetailSerializer will serve as an extension of the RecipeSerializer.
 class RecipeDetailSerializer(RecipeSerializer):
@@ -111,3 +188,200 @@ class RecipeImageSerializer(serializers.ModelSerializer):
         fields = ["id", "image"]
         read_only_fields = ["id"]
         extra_kwargs = {"image": {"required": "True"}}
+
+
+class RecipeBulkItemSerializer(serializers.Serializer):
+    """Serializer for one operation of a bulk recipe request."""
+
+    op = serializers.ChoiceField(choices=["create", "update", "delete"])
+    id = serializers.IntegerField(required=False)
+    data = serializers.DictField(required=False)
+
+    def validate(self, attrs):
+        """Check the operation has what it needs and validate its data."""
+        op = attrs["op"]
+        if op == "create" and "id" in attrs:
+            msg = _("New recipes can't have an ID.")
+            raise serializers.ValidationError({"id": msg}, code="invalid")
+        if op != "create" and "id" not in attrs:
+            msg = _("This field is required.")
+            raise serializers.ValidationError({"id": msg}, code="required")
+        if op == "delete":
+            return attrs
+        if "data" not in attrs:
+            msg = _("This field is required.")
+            raise serializers.ValidationError({"data": msg}, code="required")
+
+        recipe_serializer = RecipeDetailSerializer(
+            data=attrs["data"],
+            partial=op == "update",
+            context=self.context,
+        )
+        if not recipe_serializer.is_valid():
+            raise serializers.ValidationError(
+                {"data": recipe_serializer.errors}
+            )
+        attrs["data"] = recipe_serializer.validated_data
+
+        return attrs
+
+
+class RecipeImportSerializer(serializers.Serializer):
+    """Serializer for recipe import uploads."""
+
+    file = serializers.FileField()
+    format = serializers.ChoiceField(
+        choices=["ndjson", "csv"], required=False
+    )
+    start_line = serializers.IntegerField(min_value=0, default=0)
+
+    def validate(self, attrs):
+        """Pick the format from the file name when it isn't given."""
+        if "format" not in attrs:
+            is_csv = attrs["file"].name.lower().endswith(".csv")
+            attrs["format"] = "csv" if is_csv else "ndjson"
+        return attrs
+
+
+class IDListField(serializers.CharField):
+    """Field for a comma separated list of IDs."""
+
+    default_error_messages = {
+        "invalid_ids": _("Must be a comma separated list of IDs."),
+    }
+    # Largest value of the bigint primary keys.
+    max_id = 2 ** 63 - 1
+
+    def to_internal_value(self, data):
+        value = super().to_internal_value(data)
+        try:
+            ids = [int(str_id) for str_id in value.split(",")]
+        except ValueError:
+            self.fail("invalid_ids")
+        # We reject IDs no key can have, before they reach a query.
+        if not all(0 < pk <= self.max_id for pk in ids):
+            self.fail("invalid_ids")
+
+        return ids
+
+
+class RecipeFilterSerializer(serializers.Serializer):
+    """Serializer for the related and range filters of the recipe list."""
+
+    tags = IDListField(required=False, allow_blank=True)
+    ingredients = IDListField(required=False, allow_blank=True)
+    max_time = serializers.IntegerField(min_value=0, required=False)
+    min_price = serializers.DecimalField(
+        max_digits=None, decimal_places=None, min_value=0, required=False
+    )
+    max_price = serializers.DecimalField(
+        max_digits=None, decimal_places=None, min_value=0, required=False
+    )
+
+
+class RecipeAttrFilterSerializer(serializers.Serializer):
+    """Serializer for the options of the tag and ingredient lists."""
+
+    assigned_only = serializers.BooleanField(default=False)
+    with_counts = serializers.BooleanField(default=False)
+
+
+class LimitSerializer(serializers.Serializer):
+    """Serializer for the number of results a request asks for."""
+
+    limit = serializers.IntegerField(min_value=1, required=False)
+
+
+class RecipePantrySerializer(serializers.Serializer):
+    """Serializer for the pantry of the cookable recipes list."""
+
+    pantry = IDListField(required=False)
+    pantry_names = serializers.ListField(
+        child=serializers.CharField(), required=False
+    )
+    max_missing = serializers.IntegerField(min_value=0, required=False)
+
+    def validate(self, attrs):
+        """Check the pantry holds some ingredients, but not too many."""
+        size = len(attrs.get("pantry", [])) + len(
+            attrs.get("pantry_names", [])
+        )
+        if not size:
+            msg = _("Give at least one ingredient ID or name.")
+            raise serializers.ValidationError(msg, code="required")
+        if size > settings.RECIPE_PANTRY_MAX_INGREDIENTS:
+            msg = _("A pantry holds at most %(max)d ingredients.") % {
+                "max": settings.RECIPE_PANTRY_MAX_INGREDIENTS
+            }
+            raise serializers.ValidationError(msg, code="max_length")
+        return attrs
+
+
+class RecipeStatsTotalsSerializer(serializers.Serializer):
+    """Serializer for the totals of a user's recipe data."""
+
+    recipes = serializers.IntegerField()
+    tags = serializers.IntegerField()
+    ingredients = serializers.IntegerField()
+
+
+class RecipeStatsBucketSerializer(serializers.Serializer):
+    """Serializer for one bucket of a histogram."""
+
+    min = serializers.FloatField()
+    max = serializers.FloatField()
+    count = serializers.IntegerField()
+
+
+class RecipeDistributionSerializer(serializers.Serializer):
+    """Serializer for the distribution of a recipe column."""
+
+    min = serializers.FloatField(allow_null=True)
+    max = serializers.FloatField(allow_null=True)
+    avg = serializers.FloatField(allow_null=True)
+    percentiles = serializers.DictField(child=serializers.FloatField())
+    histogram = RecipeStatsBucketSerializer(many=True)
+
+
+class RecipeStatsLinkSerializer(serializers.Serializer):
+    """Serializer for a top tag or ingredient with its recipe averages."""
+
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    recipe_count = serializers.IntegerField()
+    avg_price = serializers.FloatField()
+    avg_time_minutes = serializers.FloatField()
+
+
+class RecipeStatsSerializer(serializers.Serializer):
+    """Serializer for the statistics of a user's recipes."""
+
+    totals = RecipeStatsTotalsSerializer()
+    price = RecipeDistributionSerializer()
+    time_minutes = RecipeDistributionSerializer()
+    top_tags = RecipeStatsLinkSerializer(many=True)
+    top_ingredients = RecipeStatsLinkSerializer(many=True)
+
+
+class RecipeShoppingListSerializer(serializers.Serializer):
+    """Serializer for the recipes of a shopping list."""
+
+    recipes = IDListField()
+
+    def validate_recipes(self, value):
+        """Check the shopping list isn't made of too many recipes."""
+        if len(set(value)) > settings.RECIPE_SHOPPING_LIST_MAX_RECIPES:
+            msg = _("A shopping list holds at most %(max)d recipes.") % {
+                "max": settings.RECIPE_SHOPPING_LIST_MAX_RECIPES
+            }
+            raise serializers.ValidationError(msg, code="max_length")
+        return value
+
+
+class ShoppingListItemSerializer(serializers.Serializer):
+    """Serializer for an ingredient of a shopping list."""
+
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    count = serializers.IntegerField()
+    recipes = serializers.ListField(child=serializers.IntegerField())
@@ -0,0 +1,139 @@
+"""
+Signal handlers for the recipe app.
+"""
+import threading
+from contextlib import contextmanager
+
+from django.db.models import F
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+
+from core.models import Recipe, Tag, Ingredient
+from recipe.cache import bump_data_version
+
+
+_counts = threading.local()
+
+# Through model -> (linked model, its column in the through table, the
+# recipe field holding its IDs).
+LINKED_MODELS = {
+    Recipe.tags.through: (Tag, "tag_id", "tag_ids"),
+    Recipe.ingredients.through: (
+        Ingredient, "ingredient_id", "ingredient_ids"
+    ),
+}
+
+
+@contextmanager
+def recipe_counts_suspended():
+    """Stop counting links while a bulk write adjusts the counts itself."""
+    suspended = getattr(_counts, "suspended", False)
+    _counts.suspended = True
+    try:
+        yield
+    finally:
+        _counts.suspended = suspended
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_changed_object(sender, instance, **kwargs):
+    """Invalidate the cached responses of the object's owner."""
+    bump_data_version(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def invalidate_changed_links(sender, instance, action, **kwargs):
+    """Invalidate the cached responses when recipe links change."""
+    # Recipes, tags and ingredients are all owned by the same user,
+    # whichever side of the relation the change was made from.
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_data_version(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def count_changed_links(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep the recipe counts of tags and ingredients up to date."""
+    if getattr(_counts, "suspended", False):
+        return
+    attr_model, related_id, ids_field = LINKED_MODELS[sender]
+
+    if not reverse:
+        # Changed from a recipe, pk_set holds tag or ingredient IDs. Added
+        # IDs are only the new links, but removed IDs may not be linked.
+        if action == "post_add":
+            attr_model.objects.add_recipe_counts({pk: 1 for pk in pk_set})
+        elif action in ("pre_remove", "pre_clear"):
+            links = sender.objects.filter(recipe_id=instance.pk)
+            if action == "pre_remove":
+                links = links.filter(**{f"{related_id}__in": pk_set})
+            attr_model.objects.filter(
+                pk__in=links.values(related_id)
+            ).update(recipe_count=F("recipe_count") - 1)
+    else:
+        # Changed from a tag or ingredient, pk_set holds recipe IDs.
+        if action == "post_add":
+            attr_model.objects.add_recipe_counts({instance.pk: len(pk_set)})
+        elif action == "pre_remove":
+            linked = sender.objects.filter(
+                recipe_id__in=pk_set, **{related_id: instance.pk}
+            ).count()
+            attr_model.objects.add_recipe_counts({instance.pk: -linked})
+        elif action == "post_clear":
+            attr_model.objects.filter(pk=instance.pk).update(recipe_count=0)
+
+
+@receiver(pre_delete, sender=Recipe)
+def count_deleted_recipe(sender, instance, **kwargs):
+    """Stop counting a deleted recipe for its tags and ingredients."""
+    if getattr(_counts, "suspended", False):
+        return
+    for model in (Tag, Ingredient):
+        model.objects.filter(recipe=instance).update(
+            recipe_count=F("recipe_count") - 1
+        )
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def sync_changed_link_ids(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep the tag and ingredient ID arrays of recipes up to date."""
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if pk_set is not None and not pk_set:
+        return
+    attr_model, related_id, ids_field = LINKED_MODELS[sender]
+
+    if not reverse:
+        Recipe.objects.sync_link_ids(pk=instance.pk)
+    elif action == "post_clear":
+        # The links are gone, but the arrays still list the tag or
+        # ingredient, and their index finds the recipes.
+        Recipe.objects.sync_link_ids(
+            **{f"{ids_field}__contains": [instance.pk]}
+        )
+    else:
+        Recipe.objects.sync_link_ids(pk__in=pk_set)
+
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def sync_deleted_link_ids(sender, instance, **kwargs):
+    """Drop a deleted tag or ingredient from the recipe ID arrays."""
+    # Deleting cascades to the links without m2m_changed signals.
+    for attr_model, related_id, ids_field in LINKED_MODELS.values():
+        if attr_model is sender:
+            Recipe.objects.sync_link_ids(
+                **{f"{ids_field}__contains": [instance.pk]}
+            )
@@ -0,0 +1,138 @@
+"""
+Statistics of a user's recipes, computed in the database.
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.db.models import (
+    Aggregate,
+    Avg,
+    Count,
+    F,
+    FloatField,
+    Func,
+    IntegerField,
+    Max,
+    Min,
+    Value,
+)
+from django.db.models.functions import Least
+
+from core.models import Recipe, Tag, Ingredient
+
+
+# Percentiles of the distributions, as fractions.
+PERCENTILES = (0.25, 0.5, 0.75, 0.9)
+# Recipe columns whose distributions are computed.
+DISTRIBUTION_FIELDS = ("price", "time_minutes")
+
+
+class Percentiles(Aggregate):
+    """The continuous percentiles of a column, as an array."""
+
+    function = "percentile_cont"
+    template = (
+        "%(function)s(%(fractions)s) WITHIN GROUP (ORDER BY %(expressions)s)"
+    )
+    output_field = ArrayField(FloatField())
+
+    def __init__(self, expression, fractions, **extra):
+        # The fractions are our own constants, so they're inlined.
+        fractions = ", ".join(str(float(fraction)) for fraction in fractions)
+        super().__init__(
+            expression, fractions=f"ARRAY[{fractions}]", **extra
+        )
+
+
+def _get_histogram(recipes, field, low, high):
+    """Return the counts of equal width buckets between two values."""
+    buckets = settings.RECIPE_STATS_BUCKETS
+    width = (high - low) / buckets
+    if width:
+        # width_bucket() puts the maximum past the last bucket, so it's
+        # moved back into it.
+        bucket = Least(
+            Func(
+                F(field), Value(low), Value(high), Value(buckets),
+                function="width_bucket",
+                output_field=IntegerField(),
+            ),
+            Value(buckets),
+        )
+        counts = dict(recipes.annotate(bucket=bucket).order_by().values(
+            "bucket"
+        ).annotate(count=Count("id")).values_list("bucket", "count"))
+    else:
+        # Every recipe has the same value, so they share one bucket.
+        counts = {1: recipes.count()}
+        buckets = 1
+
+    return [
+        {
+            "min": low + width * n,
+            "max": low + width * (n + 1) if n + 1 < buckets else high,
+            "count": counts.get(n + 1, 0),
+        }
+        for n in range(buckets)
+    ]
+
+
+def _get_top(model, user):
+    """Return the most used tags or ingredients with recipe averages."""
+    # The maintained counts find the top ones in the index, then only
+    # their links are joined for the averages.
+    top = model.objects.filter(user=user, recipe_count__gt=0).order_by(
+        "-recipe_count", "name"
+    )[:settings.RECIPE_STATS_TOP]
+
+    return list(model.objects.filter(id__in=top.values("id")).annotate(
+        avg_price=Avg("recipe__price"),
+        avg_time_minutes=Avg("recipe__time_minutes"),
+    ).order_by("-recipe_count", "name").values(
+        "id", "name", "recipe_count", "avg_price", "avg_time_minutes"
+    ))
+
+
+def get_recipe_stats(user):
+    """Return the totals, distributions and top links of user's recipes."""
+    recipes = Recipe.objects.filter(user=user)
+    aggregates = {"count": Count("id")}
+    for field in DISTRIBUTION_FIELDS:
+        aggregates.update({
+            f"{field}_min": Min(field),
+            f"{field}_max": Max(field),
+            f"{field}_avg": Avg(field),
+            f"{field}_percentiles": Percentiles(field, PERCENTILES),
+        })
+    # Every distribution is summarized in a single pass over the recipes.
+    summary = recipes.aggregate(**aggregates)
+
+    stats = {
+        "totals": {
+            "recipes": summary["count"],
+            "tags": Tag.objects.filter(user=user).count(),
+            "ingredients": Ingredient.objects.filter(user=user).count(),
+        },
+        "top_tags": _get_top(Tag, user),
+        "top_ingredients": _get_top(Ingredient, user),
+    }
+    for field in DISTRIBUTION_FIELDS:
+        low = summary[f"{field}_min"]
+        high = summary[f"{field}_max"]
+        percentiles = summary[f"{field}_percentiles"] or []
+        stats[field] = {
+            "min": low,
+            "max": high,
+            "avg": summary[f"{field}_avg"],
+            "percentiles": {
+                f"p{round(fraction * 100)}": value
+                for fraction, value in zip(PERCENTILES, percentiles)
+            },
+            "histogram": (
+                [] if low is None
+                else _get_histogram(recipes, field, Decimal(low), high)
+            ),
+        }
+
+    return stats
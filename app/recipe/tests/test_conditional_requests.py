@@ -0,0 +1,185 @@
+"""
+Tests for conditional requests to the recipe APIs.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tag
+from recipe.cache import get_cache
+from recipe.tests.utils import create_recipe
+
+
+RECIPES_URL = reverse("recipe:recipe-list")
+TAGS_URL = reverse("recipe:tag-list")
+
+
+def detail_url(recipe_id):
+    """Create and return a recipe detail URL."""
+    return reverse("recipe:recipe-detail", args=[recipe_id])
+
+
+class ConditionalGetTests(TestCase):
+    """Test If-None-Match requests."""
+
+    def setUp(self):
+        get_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            "user@example.com",
+            "testpass123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.recipe = create_recipe(user=self.user)
+
+    def test_matching_etag_not_modified(self):
+        """Test a matching ETag is answered without loading anything."""
+        res = self.client.get(detail_url(self.recipe.id))
+        etag = res["ETag"]
+
+        with self.assertNumQueries(0):
+            res = self.client.get(
+                detail_url(self.recipe.id),
+                HTTP_IF_NONE_MATCH=etag,
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], etag)
+        self.assertEqual(res.content, b"")
+
+    def test_weak_etag_matches(self):
+        """Test If-None-Match ignores the weak marker."""
+        etag = self.client.get(RECIPES_URL)["ETag"]
+
+        res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=f"W/{etag}")
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_change_returns_full_response(self):
+        """Test a change to the user's data changes the ETag."""
+        etag = self.client.get(RECIPES_URL)["ETag"]
+
+        create_recipe(user=self.user, title="Another recipe")
+        res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 2)
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_etag_per_representation(self):
+        """Test different URLs and parameters get different ETags."""
+        etags = {
+            self.client.get(RECIPES_URL)["ETag"],
+            self.client.get(RECIPES_URL, {"page_size": 1})["ETag"],
+            self.client.get(detail_url(self.recipe.id))["ETag"],
+            self.client.get(TAGS_URL)["ETag"],
+        }
+
+        self.assertEqual(len(etags), 4)
+
+    def test_missing_recipe_has_no_etag(self):
+        """Test error responses don't get an ETag."""
+        res = self.client.get(detail_url(self.recipe.id + 1))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn("ETag", res)
+
+
+class ConditionalUpdateTests(TestCase):
+    """Test If-Match requests."""
+
+    def setUp(self):
+        get_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            "user@example.com",
+            "testpass123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.recipe = create_recipe(user=self.user)
+
+    def test_matching_etag_updates(self):
+        """Test an update with the current ETag is applied."""
+        etag = self.client.get(detail_url(self.recipe.id))["ETag"]
+
+        res = self.client.patch(
+            detail_url(self.recipe.id),
+            {"title": "New title"},
+            HTTP_IF_MATCH=etag,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.title, "New title")
+
+    def test_stale_etag_rejected(self):
+        """Test an update based on a stale ETag is rejected."""
+        etag = self.client.get(detail_url(self.recipe.id))["ETag"]
+        self.client.patch(detail_url(self.recipe.id), {"title": "First"})
+
+        res = self.client.put(
+            detail_url(self.recipe.id),
+            {"title": "Second", "time_minutes": 5, "price": "1.00"},
+            HTTP_IF_MATCH=etag,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.title, "First")
+
+    def test_update_returns_new_etag(self):
+        """Test an update returns the ETag the next If-Match sends."""
+        etag = self.client.get(detail_url(self.recipe.id))["ETag"]
+
+        res = self.client.patch(
+            detail_url(self.recipe.id),
+            {"title": "First"},
+            HTTP_IF_MATCH=etag,
+        )
+        self.assertNotEqual(res["ETag"], etag)
+        self.assertEqual(
+            self.client.get(detail_url(self.recipe.id))["ETag"], res["ETag"]
+        )
+
+        res = self.client.patch(
+            detail_url(self.recipe.id),
+            {"title": "Second"},
+            HTTP_IF_MATCH=res["ETag"],
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_tag_update_with_detail_etag(self):
+        """Test tag updates match the ETag of the tag detail."""
+        tag = Tag.objects.create(user=self.user, name="Vegan")
+        url = reverse("recipe:tag-detail", args=[tag.id])
+        res = self.client.get(url)
+        self.assertEqual(res.data, {"id": tag.id, "name": "Vegan"})
+
+        res = self.client.patch(
+            url,
+            {"name": "Vegetarian"},
+            HTTP_IF_MATCH=res["ETag"],
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("ETag", res)
+        tag.refresh_from_db()
+        self.assertEqual(tag.name, "Vegetarian")
+
+    def test_tag_update_checks_etag(self):
+        """Test tag updates support If-Match too."""
+        tag = Tag.objects.create(user=self.user, name="Vegan")
+        url = reverse("recipe:tag-detail", args=[tag.id])
+
+        res = self.client.patch(
+            url,
+            {"name": "Vegetarian"},
+            HTTP_IF_MATCH='"stale"',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        tag.refresh_from_db()
+        self.assertEqual(tag.name, "Vegan")
@@ -144,3 +144,48 @@ class PrivateIngredientsApiTests(TestCase):
         res = self.client.get(INGREDIENTS_URL, {"assigned_only": 1})
 
         self.assertEqual(len(res.data), 1)
+
+    def test_ingredients_with_counts(self):
+        """Test ingredients can be listed with their recipe counts."""
+        eggs = Ingredient.objects.create(user=self.user, name="Eggs")
+        thyme = Ingredient.objects.create(user=self.user, name="Thyme")
+        for n in range(2):
+            recipe = Recipe.objects.create(
+                title=f"Eggs {n}",
+                time_minutes=10,
+                price=Decimal("2.00"),
+                user=self.user,
+            )
+            recipe.ingredients.add(eggs)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(INGREDIENTS_URL, {"with_counts": 1})
+
+        self.assertEqual(res.data, [
+            {"id": thyme.id, "name": "Thyme", "recipe_count": 0},
+            {"id": eggs.id, "name": "Eggs", "recipe_count": 2},
+        ])
+
+        res = self.client.get(
+            INGREDIENTS_URL, {"with_counts": 1, "assigned_only": 1}
+        )
+
+        self.assertEqual(
+            res.data, [{"id": eggs.id, "name": "Eggs", "recipe_count": 2}]
+        )
+
+    def test_autocomplete_ingredients(self):
+        """Test suggesting ingredients with their counts."""
+        eggs = Ingredient.objects.create(user=self.user, name="Eggs")
+        eggplant = Ingredient.objects.create(user=self.user, name="Eggplant")
+        Ingredient.objects.create(user=self.user, name="Leek")
+
+        res = self.client.get(INGREDIENTS_URL, {"q": "egg", "with_counts": 1})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, [
+            {"id": eggs.id, "name": "Eggs", "recipe_count": 0},
+            {"id": eggplant.id, "name": "Eggplant", "recipe_count": 0},
+        ])
+        res = self.client.get(INGREDIENTS_URL, {"q": "egg", "limit": 1})
+        self.assertEqual(res.data, [{"id": eggs.id, "name": "Eggs"}])
@@ -0,0 +1,107 @@
+"""
+Tests for the fast recipe read path.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from core.models import Recipe, Tag, Ingredient
+from recipe.readers import RecipeReader
+from recipe.serializers import RecipeSerializer, RecipeDetailSerializer
+from recipe.tests.utils import create_recipe
+
+
+class RecipeReaderTests(TestCase):
+    """Test the reader renders exactly what the serializers render."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "user@example.com",
+            "testpass123",
+        )
+        self.request = Request(APIRequestFactory().get("/"))
+        self.request.user = self.user
+        tags = [
+            Tag.objects.create(user=self.user, name=name)
+            for name in ["Vegan", "Dinner", "Ünïcode"]
+        ]
+        ingredients = [
+            Ingredient.objects.create(user=self.user, name=name)
+            for name in ["Salt", "Kale"]
+        ]
+        recipe = create_recipe(
+            user=self.user,
+            title='Quotes " and \\ slashes',
+            description="Line\nbreaks",
+            price=Decimal("7.5"),
+            link="https://example.com/recipe",
+            image="uploads/recipe/photo.jpg",
+        )
+        recipe.tags.add(tags[2], tags[0])
+        recipe.ingredients.add(*ingredients)
+        create_recipe(user=self.user, title="Plain").tags.add(tags[1])
+        create_recipe(user=self.user, title="Bare", price=Decimal("0"))
+
+    def assert_same_output(self, serializer_class, fields):
+        """Check both paths render the same bytes for the given fields."""
+        context = {"request": self.request}
+        instances = Recipe.objects.order_by("-id").prefetch_related(
+            Prefetch("tags", queryset=Tag.objects.order_by("id")),
+            Prefetch(
+                "ingredients", queryset=Ingredient.objects.order_by("id")
+            ),
+        )
+        expected = serializer_class(
+            instances, many=True, fields=fields, context=context
+        ).data
+
+        reader = RecipeReader(serializer_class, fields, context)
+        rows = Recipe.objects.order_by("-id").values(*reader.get_columns())
+
+        renderer = JSONRenderer()
+        self.assertEqual(
+            renderer.render(reader.render(rows)),
+            renderer.render(expected),
+        )
+
+    def test_list_fields_identical(self):
+        """Test the list fields render identically."""
+        self.assert_same_output(RecipeSerializer, RecipeSerializer.Meta.fields)
+
+    def test_detail_fields_identical(self):
+        """Test the detail fields, with the image URL, render identically."""
+        self.assert_same_output(
+            RecipeDetailSerializer, RecipeDetailSerializer.Meta.fields
+        )
+
+    def test_sparse_fields_identical(self):
+        """Test field selections render identically."""
+        self.assert_same_output(RecipeDetailSerializer, ["price", "tags"])
+        self.assert_same_output(RecipeSerializer, ["title"])
+
+    def test_api_responses_identical(self):
+        """Test the API renders recipes like the serializer would."""
+        client = APIClient()
+        client.force_authenticate(self.user)
+        recipe = Recipe.objects.get(title__startswith="Quotes")
+
+        res = client.get(reverse("recipe:recipe-detail", args=[recipe.id]))
+
+        request = Request(res.wsgi_request)
+        expected = RecipeDetailSerializer(
+            Recipe.objects.prefetch_related(
+                Prefetch("tags", queryset=Tag.objects.order_by("id")),
+                Prefetch(
+                    "ingredients", queryset=Ingredient.objects.order_by("id")
+                ),
+            ).get(id=recipe.id),
+            context={"request": request},
+        ).data
+        self.assertEqual(res.content, JSONRenderer().render(expected))
@@ -1,16 +1,22 @@
 """
 Tests for recipe APIs.
 """
+import tempfile
 from decimal import Decimal
 
+from PIL import Image
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from core.models import Recipe, Tag, Ingredient
+from recipe.pagination import KeysetPagination
 from recipe.serializers import (
     RecipeSerializer,
     RecipeDetailSerializer,
@@ -27,6 +33,11 @@ def detail_url(recipe_id):
     return reverse("recipe:recipe-detail", args=[recipe_id])
 
 
+def image_upload_url(recipe_id):
+    """Create and return an image upload URL."""
+    return reverse("recipe:recipe-upload-image", args=[recipe_id])
+
+
 def create_recipe(user, **params):
     """Create and return a sample recipe."""
     defaults = {
@@ -84,7 +95,7 @@ class PrivateRecipeAPITests(TestCase):
         recipes = Recipe.objects.all().order_by("-id")
         serializer = RecipeSerializer(recipes, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_recipe_list_limited_to_user(self):
         """Test list of recipes is limited to authenticated user."""
@@ -101,7 +112,7 @@ class PrivateRecipeAPITests(TestCase):
         serializer = RecipeSerializer(other_users_recipes, many=True)
         # print(serializer.data.user)
         # print(res.data)
-        self.assertNotIn(res.data, serializer.data)
+        self.assertNotIn(res.data["results"], serializer.data)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
         # recipes = Recipe.objects.filter(user=self.user)
@@ -307,6 +318,48 @@ class PrivateRecipeAPITests(TestCase):
         self.assertNotIn(tag_breakfast, recipe.tags.all())
         self.assertIn(tag_breakfast, Tag.objects.all())
 
+    def test_update_recipe_tags_keeps_unchanged_links(self):
+        """Test updating tags only replaces the links that changed."""
+        recipe = create_recipe(user=self.user)
+        recipe.tags.add(
+            Tag.objects.create(user=self.user, name="Breakfast"),
+            Tag.objects.create(user=self.user, name="Lunch"),
+        )
+        kept_link = Recipe.tags.through.objects.get(
+            recipe=recipe, tag__name="Breakfast"
+        )
+
+        payload = {"tags": [{"name": "Breakfast"}, {"name": "Brunch"}]}
+        res = self.client.patch(detail_url(recipe.id), payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            sorted(recipe.tags.values_list("name", flat=True)),
+            ["Breakfast", "Brunch"],
+        )
+        self.assertTrue(
+            Recipe.tags.through.objects.filter(id=kept_link.id).exists()
+        )
+
+    def test_update_recipe_unchanged_tags_writes_nothing(self):
+        """Test resending the same tags doesn't touch the links."""
+        recipe = create_recipe(user=self.user)
+        recipe.tags.add(Tag.objects.create(user=self.user, name="Breakfast"))
+        payload = {"tags": [{"name": "Breakfast"}]}
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.patch(
+                detail_url(recipe.id), payload, format="json"
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        through_table = Recipe.tags.through._meta.db_table
+        for query in queries:
+            self.assertFalse(
+                query["sql"].startswith(("INSERT", "DELETE"))
+                and through_table in query["sql"]
+            )
+
     def test_clear_recipe_tags(self):
         """Test clearing a recipes tags."""
         tag = Tag.objects.create(user=self.user, name="Dessert")
@@ -320,6 +373,37 @@ class PrivateRecipeAPITests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(recipe.tags.count(), 0)
 
+    def test_create_recipe_query_count_is_constant(self):
+        """Test creating a recipe costs the same queries for any size."""
+        Ingredient.objects.create(user=self.user, name="Ingredient 0")
+        payload = {
+            "title": "Big Stew",
+            "time_minutes": 90,
+            "price": Decimal("12.00"),
+            "tags": [{"name": "Dinner"}, {"name": "Dinner"}],
+            "ingredients": [{"name": "Ingredient 0"}, {"name": "Carrot"}],
+        }
+        # Recipe insert, three queries per relation to look up and create
+        # names, one link lookup, insert, count update and ID array sync
+        # per relation, the nested response and the transaction savepoint.
+        with self.assertNumQueries(19):
+            res = self.client.post(RECIPES_URL, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data["tags"]), 1)
+
+        payload["tags"] = [{"name": "Dinner"}, {"name": "Winter"}]
+        payload["ingredients"] = [
+            {"name": f"Ingredient {n}"} for n in range(30)
+        ]
+        with self.assertNumQueries(19):
+            res = self.client.post(RECIPES_URL, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data["ingredients"]), 30)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(
+            Ingredient.objects.filter(user=self.user).count(), 31
+        )
+
     def test_create_recipe_with_new_ingredients(self):
         """Test creating a recipe with new ingredients."""
         payload = {
@@ -424,9 +508,9 @@ class PrivateRecipeAPITests(TestCase):
         s2 = RecipeSerializer(r2)
         s3 = RecipeSerializer(r3)
 
-        self.assertIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertNotIn(s3.data, res.data)
+        self.assertIn(s1.data, res.data["results"])
+        self.assertIn(s2.data, res.data["results"])
+        self.assertNotIn(s3.data, res.data["results"])
 
     def test_filter_by_ingredients(self):
         """Test filtering recipes by ingredients"""
@@ -445,6 +529,428 @@ class PrivateRecipeAPITests(TestCase):
         s2 = RecipeSerializer(r2)
         s3 = RecipeSerializer(r3)
 
-        self.assertIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertNotIn(s3.data, res.data)
+        self.assertIn(s1.data, res.data["results"])
+        self.assertIn(s2.data, res.data["results"])
+        self.assertNotIn(s3.data, res.data["results"])
+
+
+class RecipeQueryCountTests(TestCase):
+    """Test the number of queries issued per recipe action."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email="queries@example.com",
+            password="testpass123",
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def create_tagged_recipe(self, n):
+        """Create a recipe with a few tags and ingredients."""
+        recipe = create_recipe(user=self.user, title=f"Recipe {n}")
+        recipe.tags.add(
+            Tag.objects.create(user=self.user, name=f"Tag {n}"),
+            Tag.objects.create(user=self.user, name=f"Other tag {n}"),
+        )
+        recipe.ingredients.add(
+            Ingredient.objects.create(user=self.user, name=f"Ingredient {n}"),
+        )
+        return recipe
+
+    def test_list_query_count_is_constant(self):
+        """Test listing recipes costs the same queries for any size."""
+        for n in range(3):
+            self.create_tagged_recipe(n)
+        # One query for the recipes plus one per nested relation.
+        with self.assertNumQueries(3):
+            res = self.client.get(RECIPES_URL)
+        self.assertEqual(len(res.data["results"]), 3)
+
+        for n in range(3, 10):
+            self.create_tagged_recipe(n)
+        with self.assertNumQueries(3):
+            res = self.client.get(RECIPES_URL)
+        self.assertEqual(len(res.data["results"]), 10)
+
+    def test_list_matches_serializer_output(self):
+        """Test the projected queryset renders the same as a full one."""
+        for n in range(3):
+            self.create_tagged_recipe(n)
+
+        res = self.client.get(RECIPES_URL)
+
+        recipes = Recipe.objects.filter(user=self.user).order_by("-id")
+        serializer = RecipeSerializer(recipes, many=True)
+        self.assertEqual(res.data["results"], serializer.data)
+
+    def test_retrieve_query_count(self):
+        """Test retrieving a recipe prefetches its relations."""
+        recipe = self.create_tagged_recipe(0)
+
+        with self.assertNumQueries(3):
+            res = self.client.get(detail_url(recipe.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["tags"]), 2)
+        self.assertEqual(len(res.data["ingredients"]), 1)
+
+    def test_partial_update_query_count(self):
+        """Test updating a recipe skips the unused prefetches."""
+        recipe = self.create_tagged_recipe(0)
+
+        # Fetch, update, one query per relation for the response and the
+        # transaction savepoint.
+        with self.assertNumQueries(6):
+            res = self.client.patch(detail_url(recipe.id), {"title": "New"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["tags"]), 2)
+
+    @override_settings(MEDIA_ROOT=tempfile.gettempdir())
+    def test_upload_image_query_count(self):
+        """Test uploading an image only loads and writes the image."""
+        recipe = self.create_tagged_recipe(0)
+
+        with tempfile.NamedTemporaryFile(suffix=".jpg") as image_file:
+            Image.new("RGB", (10, 10)).save(image_file, format="JPEG")
+            image_file.seek(0)
+            with self.assertNumQueries(2):
+                res = self.client.post(
+                    image_upload_url(recipe.id),
+                    {"image": image_file},
+                    format="multipart",
+                )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.title, "Recipe 0")
+        recipe.image.delete()
+
+
+class RecipeSparseFieldsTests(TestCase):
+    """Test selecting the fields of recipe responses."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email="fields@example.com",
+            password="testpass123",
+        )
+        self.client.force_authenticate(user=self.user)
+        self.recipe = create_recipe(user=self.user)
+        self.recipe.tags.add(Tag.objects.create(user=self.user, name="Vegan"))
+
+    def test_fields_selects_columns_and_skips_prefetches(self):
+        """Test ?fields= prunes the response and the queries."""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(RECIPES_URL, {"fields": "id,title"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data["results"],
+            [{"id": self.recipe.id, "title": self.recipe.title}],
+        )
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("price", queries[0]["sql"])
+
+    def test_omit_skips_relation(self):
+        """Test ?omit= drops a relation and its prefetch."""
+        with self.assertNumQueries(2):
+            res = self.client.get(
+                detail_url(self.recipe.id),
+                {"omit": "ingredients,description"},
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("ingredients", res.data)
+        self.assertNotIn("description", res.data)
+        self.assertEqual(res.data["tags"][0]["name"], "Vegan")
+
+    def test_unknown_field_rejected(self):
+        """Test asking for fields the serializer lacks is an error."""
+        res = self.client.get(RECIPES_URL, {"fields": "title,description"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("fields", res.data)
+
+
+class RecipePaginationTests(TestCase):
+    """Test paginating the recipe list."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email="pages@example.com",
+            password="testpass123",
+        )
+        self.client.force_authenticate(user=self.user)
+        self.recipes = [
+            create_recipe(user=self.user, title=f"Recipe {n}")
+            for n in range(5)
+        ]
+
+    def test_walk_pages(self):
+        """Test following next links returns every recipe once."""
+        res = self.client.get(RECIPES_URL, {"page_size": 2})
+
+        ids = []
+        while True:
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(res.data["results"]), 2)
+            ids += [recipe["id"] for recipe in res.data["results"]]
+            if res.data["next"] is None:
+                break
+            res = self.client.get(res.data["next"])
+
+        expected = sorted([recipe.id for recipe in self.recipes], reverse=True)
+        self.assertEqual(ids, expected)
+
+    def test_page_query_count_is_constant(self):
+        """Test a deep page costs the same queries as the first one."""
+        with self.assertNumQueries(3):
+            res = self.client.get(RECIPES_URL, {"page_size": 1})
+        for _ in range(3):
+            with self.assertNumQueries(3):
+                res = self.client.get(res.data["next"])
+
+        self.assertEqual(res.data["results"][0]["id"], self.recipes[1].id)
+
+    @override_settings(RECIPE_PAGE_SIZE=2, RECIPE_MAX_PAGE_SIZE=3)
+    def test_page_size_capped(self):
+        """Test the page size defaults and is capped by the settings."""
+        res = self.client.get(RECIPES_URL)
+        self.assertEqual(len(res.data["results"]), 2)
+
+        res = self.client.get(RECIPES_URL, {"page_size": 100})
+        self.assertEqual(len(res.data["results"]), 3)
+
+    def test_invalid_cursor(self):
+        """Test an invalid cursor returns not found."""
+        res = self.client.get(RECIPES_URL, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tampered_cursor(self):
+        """Test cursors with values of the wrong types return not found."""
+        pagination = KeysetPagination()
+        for position, params in [
+            (["abc"], {}),
+            ([None], {}),
+            ([[1]], {}),
+            (["x", 1], {"ordering": "price"}),
+            ([None, 1], {"ordering": "-time_minutes"}),
+            (["x", 1], {"search": "recipe"}),
+        ]:
+            cursor = pagination.encode_cursor(position)
+
+            res = self.client.get(RECIPES_URL, {"cursor": cursor, **params})
+
+            self.assertEqual(
+                res.status_code, status.HTTP_404_NOT_FOUND, position
+            )
+
+
+class RecipeFilterMatchTests(TestCase):
+    """Test matching any or all of the filtered tags and ingredients."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email="filters@example.com",
+            password="testpass123",
+        )
+        self.client.force_authenticate(user=self.user)
+        self.vegan = Tag.objects.create(user=self.user, name="Vegan")
+        self.quick = Tag.objects.create(user=self.user, name="Quick")
+        self.rice = Ingredient.objects.create(user=self.user, name="Rice")
+        self.beans = Ingredient.objects.create(user=self.user, name="Beans")
+
+        self.both = create_recipe(user=self.user, title="Rice and beans")
+        self.both.tags.add(self.vegan, self.quick)
+        self.both.ingredients.add(self.rice, self.beans)
+        self.one = create_recipe(user=self.user, title="Plain rice")
+        self.one.tags.add(self.quick)
+        self.one.ingredients.add(self.rice)
+
+    def get_ids(self, params):
+        res = self.client.get(RECIPES_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [recipe["id"] for recipe in res.data["results"]]
+
+    def test_match_any_returns_each_recipe_once(self):
+        """Test recipes matching several tags aren't duplicated."""
+        ids = self.get_ids({"tags": f"{self.vegan.id},{self.quick.id}"})
+
+        self.assertEqual(ids, [self.one.id, self.both.id])
+
+    def test_match_all_tags(self):
+        """Test filtering recipes that have every given tag."""
+        ids = self.get_ids({
+            "tags": f"{self.vegan.id},{self.quick.id}",
+            "tags_match": "all",
+        })
+
+        self.assertEqual(ids, [self.both.id])
+
+    def test_match_all_ingredients(self):
+        """Test filtering recipes that have every given ingredient."""
+        ids = self.get_ids({
+            "ingredients": f"{self.rice.id},{self.beans.id}",
+            "ingredients_match": "all",
+        })
+        self.assertEqual(ids, [self.both.id])
+
+        ids = self.get_ids({
+            "ingredients": f"{self.rice.id},{self.rice.id}",
+            "ingredients_match": "all",
+        })
+        self.assertEqual(ids, [self.one.id, self.both.id])
+
+    def test_match_combined_filters(self):
+        """Test tag and ingredient filters are combined."""
+        ids = self.get_ids({
+            "tags": f"{self.quick.id}",
+            "ingredients": f"{self.rice.id},{self.beans.id}",
+            "ingredients_match": "all",
+        })
+
+        self.assertEqual(ids, [self.both.id])
+
+    def test_invalid_match_mode(self):
+        """Test an unknown match mode returns an error."""
+        res = self.client.get(
+            RECIPES_URL, {"tags": f"{self.vegan.id}", "tags_match": "some"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_ids_beyond_int4(self):
+        """Test IDs past the 32 bit range match nothing, in either mode."""
+        for match in ["any", "all"]:
+            ids = self.get_ids({
+                "tags": f"{self.quick.id},3000000000",
+                "tags_match": match,
+                "ingredients": "3000000000",
+            })
+
+            self.assertEqual(ids, [], match)
+
+    def test_invalid_ids(self):
+        """Test filters that aren't comma separated IDs return an error."""
+        for params in [{"tags": "abc"}, {"ingredients": "1,,2"}]:
+            res = self.client.get(RECIPES_URL, params)
+
+            self.assertEqual(
+                res.status_code, status.HTTP_400_BAD_REQUEST, params
+            )
+            self.assertIn(list(params)[0], res.data)
+
+    def test_empty_filter_ignored(self):
+        """Test an empty filter lists every recipe."""
+        ids = self.get_ids({"tags": ""})
+
+        self.assertEqual(ids, [self.one.id, self.both.id])
+
+
+class RecipeRangeOrderingTests(TestCase):
+    """Test filtering recipe ranges and ordering the list."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email="ranges@example.com",
+            password="testpass123",
+        )
+        self.client.force_authenticate(user=self.user)
+        self.soup = create_recipe(
+            user=self.user, title="Soup", time_minutes=20,
+            price=Decimal("4.50"),
+        )
+        self.stew = create_recipe(
+            user=self.user, title="Stew", time_minutes=90,
+            price=Decimal("8.00"),
+        )
+        self.salad = create_recipe(
+            user=self.user, title="Salad", time_minutes=10,
+            price=Decimal("12.00"),
+        )
+        self.toast = create_recipe(
+            user=self.user, title="Toast", time_minutes=5,
+            price=Decimal("4.50"),
+        )
+
+    def get_titles(self, params):
+        res = self.client.get(RECIPES_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [recipe["title"] for recipe in res.data["results"]]
+
+    def test_range_filters(self):
+        """Test filtering by maximum time and price range."""
+        self.assertEqual(
+            self.get_titles({"max_time": 30, "max_price": "10"}),
+            ["Toast", "Soup"],
+        )
+        self.assertEqual(
+            self.get_titles({"min_price": "4.51", "max_price": "8"}),
+            ["Stew"],
+        )
+
+    def test_invalid_range_filter(self):
+        """Test invalid range values return an error."""
+        res = self.client.get(RECIPES_URL, {"max_time": "soon"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("max_time", res.data)
+
+        res = self.client.get(RECIPES_URL, {"min_price": "-1"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_ordering(self):
+        """Test ordering by price, time and title, ties by ID."""
+        self.assertEqual(
+            self.get_titles({"ordering": "price"}),
+            ["Soup", "Toast", "Stew", "Salad"],
+        )
+        self.assertEqual(
+            self.get_titles({"ordering": "-price"}),
+            ["Salad", "Stew", "Toast", "Soup"],
+        )
+        self.assertEqual(
+            self.get_titles({"ordering": "-time_minutes", "max_time": 60}),
+            ["Soup", "Salad", "Toast"],
+        )
+
+        res = self.client.get(
+            RECIPES_URL, {"ordering": "title", "fields": "id"}
+        )
+        self.assertEqual(res.data["results"], [
+            {"id": recipe.id}
+            for recipe in [self.salad, self.soup, self.stew, self.toast]
+        ])
+
+    def test_ordered_pages(self):
+        """Test walking ordered pages returns every recipe once."""
+        for ordering in ["price", "-price", "title", "-time_minutes"]:
+            res = self.client.get(
+                RECIPES_URL,
+                {"ordering": ordering, "page_size": 1, "fields": "id"},
+            )
+            ids = []
+            while len(ids) < 10:
+                ids += [recipe["id"] for recipe in res.data["results"]]
+                if res.data["next"] is None:
+                    break
+                res = self.client.get(res.data["next"])
+
+            expected = self.client.get(RECIPES_URL, {"ordering": ordering})
+            self.assertEqual(
+                ids,
+                [recipe["id"] for recipe in expected.data["results"]],
+                ordering,
+            )
+
+    def test_invalid_ordering(self):
+        """Test ordering by other fields is rejected."""
+        res = self.client.get(RECIPES_URL, {"ordering": "user"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("ordering", res.data)
@@ -0,0 +1,202 @@
+"""
+Tests for the bulk recipe API.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag, Ingredient
+from recipe.tests.utils import create_recipe
+
+
+BULK_URL = reverse("recipe:recipe-bulk")
+
+
+def recipe_payload(n, **params):
+    """Return the data of a new recipe."""
+    payload = {
+        "title": f"Imported recipe {n}",
+        "time_minutes": 10 + n,
+        "price": "3.50",
+        "tags": [{"name": "Imported"}, {"name": f"Batch {n % 3}"}],
+        "ingredients": [{"name": "Salt"}, {"name": f"Ingredient {n}"}],
+    }
+    payload.update(params)
+
+    return payload
+
+
+class PublicRecipeBulkAPITests(TestCase):
+    """Test unauthenticated API requests."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        """Test auth is required to call the bulk API."""
+        res = self.client.post(BULK_URL, [], format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateRecipeBulkAPITests(TestCase):
+    """Test authenticated bulk API requests."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="bulk@example.com",
+            password="testpass123",
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_bulk_create(self):
+        """Test creating many recipes with their tags and ingredients."""
+        payload = [
+            {"op": "create", "data": recipe_payload(n)} for n in range(5)
+        ]
+
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 5)
+        recipes = Recipe.objects.filter(user=self.user)
+        self.assertEqual(recipes.count(), 5)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 4)
+        self.assertEqual(
+            Ingredient.objects.filter(user=self.user).count(), 6
+        )
+        for n, result in enumerate(res.data):
+            recipe = recipes.get(id=result["id"])
+            self.assertEqual(recipe.title, f"Imported recipe {n}")
+            self.assertEqual(result["data"]["title"], recipe.title)
+            self.assertEqual(
+                sorted(recipe.tags.values_list("name", flat=True)),
+                sorted(["Imported", f"Batch {n % 3}"]),
+            )
+            self.assertEqual(recipe.ingredients.count(), 2)
+
+    def test_bulk_query_count_is_constant(self):
+        """Test a large batch costs the same queries as a small one."""
+        payload = [
+            {"op": "create", "data": recipe_payload(n)} for n in range(2)
+        ]
+        with self.assertNumQueries(16):
+            res = self.client.post(BULK_URL, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        payload = [
+            {"op": "create", "data": recipe_payload(n)} for n in range(200)
+        ]
+        with self.assertNumQueries(16):
+            res = self.client.post(BULK_URL, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 202)
+
+    def test_bulk_update_and_delete(self):
+        """Test updating and deleting recipes in one request."""
+        lunch = Tag.objects.create(user=self.user, name="Lunch")
+        dinner = Tag.objects.create(user=self.user, name="Dinner")
+        recipe = create_recipe(user=self.user, title="Old title")
+        recipe.tags.add(lunch, dinner)
+        kept_link = Recipe.tags.through.objects.get(recipe=recipe, tag=lunch)
+        other = create_recipe(user=self.user, link="https://example.com")
+        doomed = create_recipe(user=self.user)
+        payload = [
+            {
+                "op": "update",
+                "id": recipe.id,
+                "data": {
+                    "title": "New title",
+                    "tags": [{"name": "Lunch"}, {"name": "Snack"}],
+                },
+            },
+            {"op": "update", "id": other.id, "data": {"time_minutes": 99}},
+            {"op": "delete", "id": doomed.id},
+        ]
+
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [result["op"] for result in res.data],
+            ["update", "update", "delete"],
+        )
+        recipe.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(recipe.title, "New title")
+        self.assertEqual(recipe.time_minutes, 22)
+        self.assertEqual(
+            sorted(recipe.tags.values_list("name", flat=True)),
+            ["Lunch", "Snack"],
+        )
+        self.assertTrue(
+            Recipe.tags.through.objects.filter(id=kept_link.id).exists()
+        )
+        self.assertEqual(other.time_minutes, 99)
+        self.assertEqual(other.link, "https://example.com")
+        self.assertFalse(Recipe.objects.filter(id=doomed.id).exists())
+
+    def test_bulk_ignores_list_filters(self):
+        """Test list filters in the query string don't hide the results."""
+        tag = Tag.objects.create(user=self.user, name="Other")
+        payload = [{"op": "create", "data": recipe_payload(0)}]
+
+        res = self.client.post(
+            f"{BULK_URL}?tags={tag.id}&search=nothing&max_price=1",
+            payload,
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data[0]["data"]["title"], "Imported recipe 0")
+
+    def test_bulk_invalid_items_write_nothing(self):
+        """Test one invalid item rejects the whole batch."""
+        payload = [
+            {"op": "create", "data": recipe_payload(0)},
+            {"op": "create", "data": {"title": "Missing fields"}},
+            {"op": "delete"},
+        ]
+
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn("data", res.data[1])
+        self.assertIn("id", res.data[2])
+        self.assertFalse(Recipe.objects.filter(user=self.user).exists())
+
+    def test_bulk_other_users_recipe_not_found(self):
+        """Test recipes of other users can't be changed."""
+        other_user = get_user_model().objects.create_user(
+            email="other@example.com",
+            password="testpass123",
+        )
+        recipe = create_recipe(user=other_user)
+        payload = [
+            {"op": "create", "data": recipe_payload(0)},
+            {"op": "delete", "id": recipe.id},
+        ]
+
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("id", res.data[1])
+        self.assertTrue(Recipe.objects.filter(id=recipe.id).exists())
+        self.assertFalse(Recipe.objects.filter(user=self.user).exists())
+
+    @override_settings(RECIPE_BULK_MAX_ITEMS=2)
+    def test_bulk_size_limited(self):
+        """Test a batch larger than the limit is rejected."""
+        payload = [
+            {"op": "create", "data": recipe_payload(n)} for n in range(3)
+        ]
+
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Recipe.objects.filter(user=self.user).exists())
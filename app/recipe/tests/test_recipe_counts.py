@@ -0,0 +1,163 @@
+"""
+Tests for the recipe counts of tags and ingredients.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tag, Ingredient
+from recipe.tests.utils import create_recipe
+
+
+TAGS_URL = reverse("recipe:tag-list")
+BULK_URL = reverse("recipe:recipe-bulk")
+
+
+class RecipeCountTests(TestCase):
+    """Test the counts follow every change to the links."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "user@example.com",
+            "testpass123",
+        )
+        self.vegan = Tag.objects.create(user=self.user, name="Vegan")
+        self.dinner = Tag.objects.create(user=self.user, name="Dinner")
+        self.salt = Ingredient.objects.create(user=self.user, name="Salt")
+        self.recipe = create_recipe(user=self.user)
+        self.other = create_recipe(user=self.user)
+
+    def assert_counts(self, **expected):
+        """Check the stored counts match the links and the expected ones."""
+        for name, count in expected.items():
+            obj = getattr(self, name)
+            obj.refresh_from_db()
+            self.assertEqual(obj.recipe_count, count, name)
+            self.assertEqual(obj.recipe_set.count(), count, name)
+
+    def test_add_remove_from_recipe(self):
+        """Test adding and removing links from a recipe."""
+        self.recipe.tags.add(self.vegan, self.dinner)
+        self.recipe.tags.add(self.vegan)
+        self.other.tags.add(self.vegan)
+        self.assert_counts(vegan=2, dinner=1)
+
+        self.recipe.tags.remove(self.vegan, self.dinner)
+        self.recipe.tags.remove(self.vegan)
+        self.assert_counts(vegan=1, dinner=0)
+
+    def test_set_and_clear_from_recipe(self):
+        """Test replacing and clearing the links of a recipe."""
+        self.recipe.tags.set([self.vegan])
+        self.recipe.tags.set([self.dinner])
+        self.recipe.ingredients.add(self.salt)
+        self.assert_counts(vegan=0, dinner=1, salt=1)
+
+        self.recipe.tags.clear()
+        self.recipe.ingredients.clear()
+        self.assert_counts(vegan=0, dinner=0, salt=0)
+
+    def test_changes_from_tag(self):
+        """Test adding, removing and clearing links from a tag."""
+        self.vegan.recipe_set.add(self.recipe, self.other)
+        self.vegan.recipe_set.add(self.recipe)
+        self.assert_counts(vegan=2)
+
+        self.vegan.recipe_set.remove(self.other, self.other)
+        self.assert_counts(vegan=1)
+
+        self.vegan.recipe_set.add(self.other)
+        self.vegan.recipe_set.clear()
+        self.assert_counts(vegan=0)
+
+    def test_delete_recipe(self):
+        """Test deleting a recipe stops counting it."""
+        self.recipe.tags.add(self.vegan)
+        self.recipe.ingredients.add(self.salt)
+        self.other.tags.add(self.vegan)
+
+        self.recipe.delete()
+
+        self.assert_counts(vegan=1, salt=0)
+
+    def test_bulk_writes(self):
+        """Test the bulk API keeps the counts without per-link signals."""
+        client = APIClient()
+        client.force_authenticate(self.user)
+        self.recipe.tags.add(self.vegan, self.dinner)
+        self.other.tags.add(self.vegan)
+        payload = [
+            {
+                "op": "create",
+                "data": {
+                    "title": "New",
+                    "time_minutes": 5,
+                    "price": "1.00",
+                    "tags": [{"name": "Vegan"}],
+                    "ingredients": [{"name": "Salt"}],
+                },
+            },
+            {
+                "op": "update",
+                "id": self.recipe.id,
+                "data": {"tags": [{"name": "Dinner"}]},
+            },
+            {"op": "delete", "id": self.other.id},
+        ]
+
+        res = client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assert_counts(vegan=1, dinner=1, salt=1)
+
+    def test_recount_recipes(self):
+        """Test recounting fixes only the wrong counts."""
+        self.recipe.tags.add(self.vegan, self.dinner)
+        Tag.objects.filter(id=self.vegan.id).update(recipe_count=5)
+
+        repaired = Tag.objects.recount_recipes(user=self.user)
+
+        self.assertEqual(repaired, 1)
+        self.assert_counts(vegan=1, dinner=1)
+
+
+class RecipeCountOrderingTests(TestCase):
+    """Test listing tags ordered by their recipe counts."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "user@example.com",
+            "testpass123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_order_by_recipe_count(self):
+        """Test the most used tags come first, ties ordered by name."""
+        tags = {
+            name: Tag.objects.create(user=self.user, name=name)
+            for name in ["Lunch", "Dinner", "Vegan", "Unused"]
+        }
+        for n in range(3):
+            recipe = create_recipe(user=self.user)
+            recipe.tags.add(tags["Vegan"])
+            if n:
+                recipe.tags.add(tags["Lunch"], tags["Dinner"])
+
+        res = self.client.get(TAGS_URL, {"ordering": "-recipe_count"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [tag["name"] for tag in res.data],
+            ["Vegan", "Lunch", "Dinner", "Unused"],
+        )
+
+    def test_invalid_ordering(self):
+        """Test ordering by other fields is rejected."""
+        res = self.client.get(TAGS_URL, {"ordering": "user"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("ordering", res.data)
@@ -0,0 +1,97 @@
+"""
+Tests for the recipe export API.
+"""
+import json
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tag, Ingredient
+from recipe.tests.utils import create_recipe
+
+
+EXPORT_URL = reverse("recipe:recipe-export")
+
+
+def detail_url(recipe_id):
+    """Create and return a recipe detail URL."""
+    return reverse("recipe:recipe-detail", args=[recipe_id])
+
+
+def read_lines(res):
+    """Return the objects of a streamed NDJSON response."""
+    content = b"".join(res.streaming_content).decode()
+
+    return [json.loads(line) for line in content.splitlines()]
+
+
+class RecipeExportApiTests(TestCase):
+    """Test exporting recipes."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@example.com",
+            "testpass123",
+        )
+        self.client.force_authenticate(self.user)
+        self.recipes = []
+        for n in range(5):
+            recipe = create_recipe(user=self.user, title=f"Recipe {n}")
+            recipe.tags.add(
+                Tag.objects.create(user=self.user, name=f"Tag {n}")
+            )
+            recipe.ingredients.add(
+                Ingredient.objects.create(user=self.user, name=f"Salt {n}")
+            )
+            self.recipes.append(recipe)
+
+    def test_export_streams_recipe_details(self):
+        """Test each recipe is one line holding its detail representation."""
+        other_user = get_user_model().objects.create_user(
+            "other@example.com",
+            "testpass123",
+        )
+        create_recipe(user=other_user)
+
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        lines = read_lines(res)
+        expected = [
+            self.client.get(detail_url(recipe.id)).json()
+            for recipe in reversed(self.recipes)
+        ]
+        self.assertEqual(lines, expected)
+
+    @override_settings(RECIPE_EXPORT_CHUNK_SIZE=2)
+    def test_relations_loaded_per_chunk(self):
+        """Test the queries grow with the chunks, not the recipes."""
+        res = self.client.get(EXPORT_URL)
+
+        # One cursor for the recipes, then one query per relation for
+        # each of the three chunks.
+        with self.assertNumQueries(7):
+            lines = read_lines(res)
+
+        self.assertEqual(len(lines), 5)
+
+    def test_export_fields(self):
+        """Test exports can be limited to some fields."""
+        res = self.client.get(EXPORT_URL, {"fields": "id,title"})
+
+        self.assertEqual(
+            read_lines(res)[0],
+            {"id": self.recipes[-1].id, "title": "Recipe 4"},
+        )
+
+    def test_export_requires_auth(self):
+        """Test exports need an authenticated user."""
+        res = APIClient().get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
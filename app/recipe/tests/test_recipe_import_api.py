@@ -0,0 +1,193 @@
+"""
+Tests for the recipe import API.
+"""
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag
+
+
+IMPORT_URL = reverse("recipe:recipe-import")
+
+
+def ndjson_file(*rows, name="recipes.ndjson"):
+    """Return an upload with one JSON line per row."""
+    content = "\n".join(
+        row if isinstance(row, str) else json.dumps(row) for row in rows
+    )
+
+    return SimpleUploadedFile(name, content.encode())
+
+
+def recipe_row(n, **params):
+    """Return the data of an imported recipe."""
+    row = {
+        "title": f"Imported recipe {n}",
+        "time_minutes": 10,
+        "price": "4.50",
+        "tags": [{"name": "Imported"}],
+        "ingredients": [{"name": f"Ingredient {n}"}],
+    }
+    row.update(params)
+
+    return row
+
+
+class RecipeImportApiTests(TestCase):
+    """Test importing recipes."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@example.com",
+            "testpass123",
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_import_ndjson(self):
+        """Test NDJSON rows become recipes with their tags and ingredients."""
+        upload = ndjson_file(recipe_row(1), "", recipe_row(2))
+
+        res = self.client.post(IMPORT_URL, {"file": upload})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            {"created": 2, "failed": 0, "errors": [], "last_line": 3},
+        )
+        recipes = Recipe.objects.filter(user=self.user)
+        self.assertEqual(recipes.count(), 2)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 1)
+        recipe = recipes.get(title="Imported recipe 2")
+        self.assertEqual(
+            [ingredient.name for ingredient in recipe.ingredients.all()],
+            ["Ingredient 2"],
+        )
+
+    def test_invalid_rows_reported(self):
+        """Test invalid rows are skipped and reported by line."""
+        upload = ndjson_file(
+            recipe_row(1),
+            "{not json",
+            recipe_row(3, title=""),
+            "[1, 2]",
+        )
+
+        res = self.client.post(IMPORT_URL, {"file": upload})
+
+        self.assertEqual(res.data["created"], 1)
+        self.assertEqual(res.data["failed"], 3)
+        self.assertEqual(
+            [error["line"] for error in res.data["errors"]], [2, 3, 4]
+        )
+        self.assertIn("title", res.data["errors"][1]["errors"])
+
+    def test_import_csv(self):
+        """Test CSV rows with separated tag names are imported."""
+        content = (
+            "title,time_minutes,price,tags,ingredients\n"
+            "Soup,20,3.00,Dinner|Winter,Carrot\n"
+            'Salad,5,2.50,"Lunch",\n'
+        )
+        upload = SimpleUploadedFile("recipes.csv", content.encode())
+
+        res = self.client.post(IMPORT_URL, {"file": upload})
+
+        self.assertEqual(res.data["created"], 2)
+        soup = Recipe.objects.get(user=self.user, title="Soup")
+        self.assertEqual(
+            sorted(tag.name for tag in soup.tags.all()), ["Dinner", "Winter"]
+        )
+        salad = Recipe.objects.get(user=self.user, title="Salad")
+        self.assertFalse(salad.ingredients.exists())
+
+    def test_csv_encoding_errors_reported(self):
+        """Test CSV lines that aren't UTF-8 fail only their own rows."""
+        content = (
+            "title,time_minutes,price\n".encode()
+            + "Crêpes,20,3.00\n".encode("cp1252")
+            + 'Soup,20,3.00\n"Pie\n\xff\xfe",30,4.00\n'.encode("latin-1")
+            + "Salad,5,2.50\n".encode()
+        )
+        upload = SimpleUploadedFile("recipes.csv", content)
+
+        res = self.client.post(IMPORT_URL, {"file": upload})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["created"], 2)
+        self.assertEqual(
+            [error["line"] for error in res.data["errors"]], [2, 5]
+        )
+        self.assertEqual(res.data["last_line"], 6)
+        self.assertEqual(
+            sorted(Recipe.objects.values_list("title", flat=True)),
+            ["Salad", "Soup"],
+        )
+
+    def test_csv_with_bom(self):
+        """Test a CSV starting with a byte order mark keeps its header."""
+        content = "title,time_minutes,price\nSoup,20,3.00\n"
+        upload = SimpleUploadedFile(
+            "recipes.csv", content.encode("utf-8-sig")
+        )
+
+        res = self.client.post(IMPORT_URL, {"file": upload})
+
+        self.assertEqual(res.data["created"], 1)
+        self.assertEqual(res.data["errors"], [])
+        self.assertEqual(Recipe.objects.get(user=self.user).title, "Soup")
+
+    @override_settings(RECIPE_IMPORT_CHUNK_SIZE=1)
+    def test_unreadable_file_reports_committed_lines(self):
+        """Test a file that can't be read returns the lines to resume at."""
+        content = (
+            "title,time_minutes,price\n"
+            "Soup,20,3.00\n"
+            f"{'x' * 200000},5,2.50\n"
+        )
+        upload = SimpleUploadedFile("recipes.csv", content.encode())
+
+        res = self.client.post(IMPORT_URL, {"file": upload})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("detail", res.data)
+        self.assertEqual(res.data["created"], 1)
+        self.assertEqual(res.data["last_line"], 2)
+        self.assertEqual(Recipe.objects.get(user=self.user).title, "Soup")
+
+    def test_resume_after_line(self):
+        """Test an import can skip the lines committed by a past run."""
+        upload = ndjson_file(recipe_row(1), recipe_row(2), recipe_row(3))
+
+        res = self.client.post(IMPORT_URL, {"file": upload, "start_line": 2})
+
+        self.assertEqual(res.data["created"], 1)
+        self.assertEqual(
+            Recipe.objects.get(user=self.user).title, "Imported recipe 3"
+        )
+
+    @override_settings(RECIPE_IMPORT_CHUNK_SIZE=2)
+    def test_chunk_queries_constant(self):
+        """Test the queries grow with the chunks, not the rows."""
+        upload = ndjson_file(*(
+            recipe_row(n, tags=[{"name": f"Tag {n}"}]) for n in range(2)
+        ))
+        # A savepoint, three queries per relation to resolve the names,
+        # the recipe insert, one link insert and count update per relation
+        # and the release.
+        with self.assertNumQueries(13):
+            self.client.post(IMPORT_URL, {"file": upload})
+
+        upload = ndjson_file(*(
+            recipe_row(n, tags=[{"name": f"Tag {n}"}]) for n in range(2, 8)
+        ))
+        with self.assertNumQueries(39):
+            res = self.client.post(IMPORT_URL, {"file": upload})
+        self.assertEqual(res.data["created"], 6)
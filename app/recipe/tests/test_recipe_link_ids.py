@@ -0,0 +1,131 @@
+"""
+Tests for the tag and ingredient IDs stored on recipes.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag, Ingredient
+from recipe.tests.utils import create_recipe
+
+
+BULK_URL = reverse("recipe:recipe-bulk")
+
+
+class RecipeLinkIdsTests(TestCase):
+    """Test the ID arrays follow every change to the links."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "user@example.com",
+            "testpass123",
+        )
+        self.vegan = Tag.objects.create(user=self.user, name="Vegan")
+        self.dinner = Tag.objects.create(user=self.user, name="Dinner")
+        self.salt = Ingredient.objects.create(user=self.user, name="Salt")
+        self.recipe = create_recipe(user=self.user)
+        self.other = create_recipe(user=self.user)
+
+    def assert_link_ids(self, recipe, tags=(), ingredients=()):
+        """Check the stored arrays are the sorted IDs of the links."""
+        recipe = Recipe.objects.get(id=recipe.id)
+        self.assertEqual(recipe.tag_ids, sorted(tag.id for tag in tags))
+        self.assertEqual(
+            recipe.ingredient_ids,
+            sorted(ingredient.id for ingredient in ingredients),
+        )
+        self.assertFalse(
+            Recipe.objects.with_stale_link_ids(id=recipe.id).exists()
+        )
+
+    def test_changes_from_recipe(self):
+        """Test adding, removing, setting and clearing from a recipe."""
+        self.recipe.tags.add(self.dinner, self.vegan)
+        self.recipe.ingredients.add(self.salt)
+        self.assert_link_ids(
+            self.recipe, [self.vegan, self.dinner], [self.salt]
+        )
+
+        self.recipe.tags.remove(self.vegan)
+        self.assert_link_ids(self.recipe, [self.dinner], [self.salt])
+
+        self.recipe.tags.set([self.vegan])
+        self.recipe.ingredients.clear()
+        self.assert_link_ids(self.recipe, [self.vegan])
+
+    def test_changes_from_tag(self):
+        """Test adding, removing and clearing from a tag."""
+        self.vegan.recipe_set.add(self.recipe, self.other)
+        self.dinner.recipe_set.add(self.recipe)
+        self.assert_link_ids(self.recipe, [self.vegan, self.dinner])
+        self.assert_link_ids(self.other, [self.vegan])
+
+        self.vegan.recipe_set.remove(self.other)
+        self.assert_link_ids(self.other)
+
+        self.vegan.recipe_set.clear()
+        self.assert_link_ids(self.recipe, [self.dinner])
+
+    def test_delete_tag(self):
+        """Test deleting a tag drops it from the arrays."""
+        self.recipe.tags.add(self.vegan, self.dinner)
+        self.other.tags.add(self.vegan)
+
+        self.vegan.delete()
+
+        self.assert_link_ids(self.recipe, [self.dinner])
+        self.assert_link_ids(self.other)
+
+    def test_save_keeps_arrays(self):
+        """Test saving an instance loaded before a link change keeps it."""
+        stale = Recipe.objects.get(id=self.recipe.id)
+        self.recipe.tags.add(self.vegan)
+
+        stale.title = "New title"
+        stale.save()
+
+        self.assert_link_ids(self.recipe, [self.vegan])
+
+    def test_bulk_writes(self):
+        """Test the bulk API writes the arrays with the recipes."""
+        client = APIClient()
+        client.force_authenticate(self.user)
+        self.recipe.tags.add(self.vegan)
+        self.recipe.ingredients.add(self.salt)
+        payload = [
+            {
+                "op": "create",
+                "data": {
+                    "title": "New",
+                    "time_minutes": 5,
+                    "price": "1.00",
+                    "tags": [{"name": "Vegan"}, {"name": "Dinner"}],
+                },
+            },
+            {
+                "op": "update",
+                "id": self.recipe.id,
+                "data": {"tags": [{"name": "Dinner"}]},
+            },
+        ]
+
+        res = client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        created = Recipe.objects.get(id=res.data[0]["id"])
+        self.assert_link_ids(created, [self.vegan, self.dinner])
+        self.assert_link_ids(self.recipe, [self.dinner], [self.salt])
+
+    def test_sync_link_ids(self):
+        """Test syncing rewrites only the stale arrays."""
+        self.recipe.tags.add(self.vegan)
+        self.other.tags.add(self.vegan)
+        Recipe.objects.filter(id=self.recipe.id).update(tag_ids=[])
+
+        synced = Recipe.objects.sync_link_ids(user=self.user)
+
+        self.assertEqual(synced, 1)
+        self.assert_link_ids(self.recipe, [self.vegan])
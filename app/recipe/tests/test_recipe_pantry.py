@@ -0,0 +1,183 @@
+"""
+Tests for matching recipes against a pantry.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tag, Ingredient
+from recipe.tests.utils import create_recipe
+
+
+PANTRY_URL = reverse("recipe:recipe-pantry")
+
+
+class PublicRecipePantryAPITests(TestCase):
+    """Test unauthenticated API requests."""
+
+    def test_auth_required(self):
+        """Test auth is required to match a pantry."""
+        res = APIClient().get(PANTRY_URL, {"pantry": "1"})
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateRecipePantryAPITests(TestCase):
+    """Test authenticated pantry requests."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "user@example.com",
+            "testpass123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.eggs, self.flour, self.milk, self.sugar = (
+            Ingredient.objects.create(user=self.user, name=name)
+            for name in ["Eggs", "Flour", "Milk", "Sugar"]
+        )
+
+    def match(self, **params):
+        """Return the pantry matches as (title, missing IDs) pairs."""
+        res = self.client.get(PANTRY_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        return [
+            (recipe["title"], recipe["missing_ingredients"])
+            for recipe in res.data
+        ]
+
+    def test_ranked_by_missing_ingredients(self):
+        """Test cookable recipes come first, then the ones missing more."""
+        create_recipe(
+            self.user,
+            ingredients=[self.eggs, self.sugar, self.milk],
+            title="Custard",
+        )
+        create_recipe(self.user, ingredients=[self.eggs], title="Boiled eggs")
+        create_recipe(
+            self.user,
+            ingredients=[self.eggs, self.flour, self.milk],
+            title="Pancakes",
+        )
+        create_recipe(
+            self.user, ingredients=[self.flour, self.milk], title="Crepes"
+        )
+        create_recipe(self.user, ingredients=[self.sugar], title="Caramel")
+        create_recipe(self.user, title="Water")
+
+        pantry = f"{self.eggs.id},{self.flour.id},{self.milk.id}"
+        matches = self.match(pantry=pantry)
+
+        self.assertEqual(matches, [
+            ("Crepes", []),
+            ("Pancakes", []),
+            ("Boiled eggs", []),
+            ("Custard", [self.sugar.id]),
+        ])
+
+    def test_missing_count_and_limits(self):
+        """Test max_missing and limit cut the matches."""
+        create_recipe(
+            self.user,
+            ingredients=[self.eggs, self.flour, self.sugar],
+            title="Cake",
+        )
+        create_recipe(
+            self.user, ingredients=[self.eggs, self.flour], title="Pasta"
+        )
+        create_recipe(self.user, ingredients=[self.eggs], title="Omelette")
+
+        res = self.client.get(
+            PANTRY_URL, {"pantry": str(self.eggs.id), "max_missing": 1}
+        )
+
+        self.assertEqual(
+            [(r["title"], r["missing_count"]) for r in res.data],
+            [("Omelette", 0), ("Pasta", 1)],
+        )
+        self.assertEqual(
+            self.match(pantry=str(self.eggs.id), limit=1),
+            [("Omelette", [])],
+        )
+
+    def test_pantry_by_names(self):
+        """Test pantry ingredients can be given by name."""
+        create_recipe(
+            self.user, ingredients=[self.eggs, self.milk], title="Flan"
+        )
+        other_user = get_user_model().objects.create_user(
+            "other@example.com",
+            "testpass123",
+        )
+        other_milk = Ingredient.objects.create(user=other_user, name="Milk")
+        create_recipe(other_user, ingredients=[other_milk], title="Other milk")
+
+        res = self.client.get(
+            f"{PANTRY_URL}?pantry_names=Milk&pantry_names=Eggs"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([r["title"] for r in res.data], ["Flan"])
+        self.assertEqual(res.data[0]["missing_ingredients"], [])
+
+    def test_composes_with_filters(self):
+        """Test the list filters and field selection apply to matches."""
+        quick = Tag.objects.create(user=self.user, name="Quick")
+        create_recipe(
+            self.user, ingredients=[self.eggs], title="Fried eggs"
+        ).tags.add(
+            quick
+        )
+        create_recipe(self.user, ingredients=[self.eggs], title="Slow eggs")
+
+        res = self.client.get(PANTRY_URL, {
+            "pantry": str(self.eggs.id),
+            "tags": str(quick.id),
+            "fields": "title,missing_count",
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data, [{"title": "Fried eggs", "missing_count": 0}]
+        )
+
+    def test_query_count(self):
+        """Test matching costs the same queries for any number of recipes."""
+        for n in range(5):
+            create_recipe(self.user, ingredients=[self.eggs, self.milk])
+        params = {"pantry": str(self.eggs.id), "pantry_names": "Milk"}
+
+        # The names, the matches and one query per rendered relation.
+        with self.assertNumQueries(4):
+            res = self.client.get(PANTRY_URL, params)
+
+        self.assertEqual(len(res.data), 5)
+
+    def test_ids_beyond_int4(self):
+        """Test pantry IDs past the 32 bit range are matched like others."""
+        create_recipe(self.user, ingredients=[self.eggs], title="Boiled eggs")
+
+        matches = self.match(pantry=f"{self.eggs.id},3000000000")
+
+        self.assertEqual(matches, [("Boiled eggs", [])])
+
+    @override_settings(RECIPE_PANTRY_MAX_INGREDIENTS=2)
+    def test_invalid_pantry(self):
+        """Test empty, too large and malformed pantries are rejected."""
+        for params in [
+            {},
+            {"pantry": "1,a"},
+            {"pantry": "1,0"},
+            {"pantry": str(2 ** 63)},
+            {"pantry": "1,2,3"},
+            {"pantry": "1", "max_missing": -1},
+        ]:
+            res = self.client.get(PANTRY_URL, params)
+
+            self.assertEqual(
+                res.status_code, status.HTTP_400_BAD_REQUEST, params
+            )
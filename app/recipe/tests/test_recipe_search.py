@@ -0,0 +1,139 @@
+"""
+Tests for searching recipes.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag
+from recipe.bulk import RecipeBulkWriter
+from recipe.tests.utils import create_recipe
+
+
+RECIPES_URL = reverse("recipe:recipe-list")
+
+
+class RecipeSearchTests(TestCase):
+    """Test the full-text search of the recipe list."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "user@example.com",
+            "testpass123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def search(self, text, **params):
+        """Return the titles of the recipes matching a search."""
+        res = self.client.get(RECIPES_URL, {"search": text, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        return [recipe["title"] for recipe in res.data["results"]]
+
+    def test_search_title_and_description(self):
+        """Test words are found in titles and descriptions."""
+        create_recipe(user=self.user, title="Chicken curry")
+        create_recipe(
+            user=self.user,
+            title="Weeknight rice",
+            description="Leftover chicken with rice.",
+        )
+        create_recipe(user=self.user, title="Lentil soup")
+
+        self.assertEqual(
+            self.search("chicken"), ["Chicken curry", "Weeknight rice"]
+        )
+        self.assertEqual(self.search("chicken rice"), ["Weeknight rice"])
+
+    def test_search_prefixes_and_stems(self):
+        """Test a partial last word and other word forms match."""
+        create_recipe(user=self.user, title="Roasted potatoes")
+
+        self.assertEqual(self.search("pota"), ["Roasted potatoes"])
+        self.assertEqual(self.search("Potato roas"), ["Roasted potatoes"])
+        self.assertEqual(self.search("pota roast"), [])
+        self.assertEqual(self.search("tomato"), [])
+
+    def test_search_ranks_title_first(self):
+        """Test title matches rank above description matches."""
+        create_recipe(user=self.user, title="Garlic bread")
+        create_recipe(
+            user=self.user,
+            title="Pasta",
+            description="Lots of garlic.",
+        )
+        create_recipe(user=self.user, title="Garlic bread, extra garlic")
+
+        self.assertEqual(
+            self.search("garlic"),
+            ["Garlic bread, extra garlic", "Garlic bread", "Pasta"],
+        )
+
+    def test_search_composes_with_filters(self):
+        """Test searches only match the user's recipes with the tags."""
+        tag = Tag.objects.create(user=self.user, name="Quick")
+        create_recipe(user=self.user, title="Quick pancakes").tags.add(tag)
+        create_recipe(user=self.user, title="Slow pancakes")
+        other_user = get_user_model().objects.create_user(
+            "other@example.com",
+            "testpass123",
+        )
+        create_recipe(user=other_user, title="Other pancakes")
+
+        self.assertEqual(
+            sorted(self.search("pancakes")),
+            ["Quick pancakes", "Slow pancakes"],
+        )
+        self.assertEqual(
+            self.search("pancakes", tags=str(tag.id)), ["Quick pancakes"]
+        )
+
+    def test_search_follows_writes(self):
+        """Test updated and bulk created recipes are searchable."""
+        recipe = create_recipe(user=self.user, title="Plain toast")
+        RecipeBulkWriter(self.user).create([{
+            "title": "Bulk toast",
+            "time_minutes": 5,
+            "price": Decimal("1.00"),
+        }])
+
+        self.client.patch(
+            reverse("recipe:recipe-detail", args=[recipe.id]),
+            {"title": "Fancy brioche"},
+        )
+        Recipe.objects.filter(id=recipe.id).update(time_minutes=1)
+
+        self.assertEqual(self.search("toast"), ["Bulk toast"])
+        self.assertEqual(self.search("brioche"), ["Fancy brioche"])
+
+    def test_search_pages(self):
+        """Test search results are paginated in rank order."""
+        for n in range(3):
+            create_recipe(user=self.user, title="Tofu " * (n + 1) + str(n))
+        create_recipe(user=self.user, title="Tofu again 3")
+
+        titles = []
+        params = {"search": "tofu", "page_size": 1}
+        url = RECIPES_URL
+        while url and len(titles) < 10:
+            res = self.client.get(url, params)
+            titles.extend(recipe["title"] for recipe in res.data["results"])
+            url, params = res.data["next"], None
+
+        self.assertEqual(
+            titles,
+            ["Tofu Tofu Tofu 2", "Tofu Tofu 1", "Tofu again 3", "Tofu 0"],
+        )
+
+    def test_search_ignores_operators(self):
+        """Test query syntax in the search text is treated as words."""
+        create_recipe(user=self.user, title="Chickpea stew")
+
+        self.assertEqual(self.search("stew & !chick:* |"), ["Chickpea stew"])
+        self.assertEqual(len(self.search("&!")), 1)
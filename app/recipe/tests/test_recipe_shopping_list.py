@@ -0,0 +1,125 @@
+"""
+Tests for the shopping list of recipes.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Ingredient
+from recipe.tests.utils import create_recipe
+
+
+SHOPPING_LIST_URL = reverse("recipe:recipe-shopping-list")
+
+
+class PublicShoppingListAPITests(TestCase):
+    """Test unauthenticated API requests."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        """Test auth is required to get a shopping list."""
+        res = self.client.get(SHOPPING_LIST_URL, {"recipes": "1"})
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateShoppingListAPITests(TestCase):
+    """Test authenticated shopping list requests."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "user@example.com",
+            "testpass123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.ingredients = {
+            name: Ingredient.objects.create(user=self.user, name=name)
+            for name in ["Salt", "Eggs", "Flour", "Basil"]
+        }
+
+    def shopping_list(self, recipes):
+        """Return the shopping list of some recipes."""
+        res = self.client.get(
+            SHOPPING_LIST_URL,
+            {"recipes": ",".join(str(recipe.id) for recipe in recipes)},
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        return res.data
+
+    def test_union_with_recipe_counts(self):
+        """Test each ingredient is listed once with the recipes using it."""
+        salt, eggs, flour = (
+            self.ingredients[name] for name in ["Salt", "Eggs", "Flour"]
+        )
+        omelette = create_recipe(self.user, ingredients=[salt, eggs])
+        cake = create_recipe(self.user, ingredients=[eggs, flour])
+        bread = create_recipe(self.user, ingredients=[salt, flour])
+        create_recipe(self.user, ingredients=[self.ingredients["Basil"]])
+
+        with self.assertNumQueries(1):
+            items = self.shopping_list([omelette, cake, bread, omelette])
+
+        self.assertEqual(items, [
+            {
+                "id": eggs.id,
+                "name": "Eggs",
+                "count": 2,
+                "recipes": [omelette.id, cake.id],
+            },
+            {
+                "id": flour.id,
+                "name": "Flour",
+                "count": 2,
+                "recipes": [cake.id, bread.id],
+            },
+            {
+                "id": salt.id,
+                "name": "Salt",
+                "count": 2,
+                "recipes": [omelette.id, bread.id],
+            },
+        ])
+
+    def test_other_users_recipes_ignored(self):
+        """Test recipes of other users add nothing to the list."""
+        other_user = get_user_model().objects.create_user(
+            "other@example.com",
+            "testpass123",
+        )
+        other_salt = Ingredient.objects.create(user=other_user, name="Salt")
+        other_recipe = create_recipe(other_user, ingredients=[other_salt])
+        recipe = create_recipe(
+            self.user, ingredients=[self.ingredients["Eggs"]]
+        )
+
+        items = self.shopping_list([recipe, other_recipe])
+
+        self.assertEqual([item["name"] for item in items], ["Eggs"])
+        self.assertEqual(items[0]["recipes"], [recipe.id])
+
+    def test_invalid_recipes(self):
+        """Test a missing or malformed list of recipes is rejected."""
+        for params in [{}, {"recipes": ""}, {"recipes": "1,two"}]:
+            res = self.client.get(SHOPPING_LIST_URL, params)
+
+            self.assertEqual(
+                res.status_code, status.HTTP_400_BAD_REQUEST, params
+            )
+            self.assertIn("recipes", res.data)
+
+    @override_settings(RECIPE_SHOPPING_LIST_MAX_RECIPES=2)
+    def test_too_many_recipes(self):
+        """Test a list of more recipes than the limit is rejected."""
+        res = self.client.get(SHOPPING_LIST_URL, {"recipes": "1,2,2"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.get(SHOPPING_LIST_URL, {"recipes": "1,2,3"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("recipes", res.data)
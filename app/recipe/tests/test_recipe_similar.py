@@ -0,0 +1,132 @@
+"""
+Tests for listing recipes similar to a recipe.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tag, Ingredient
+from recipe.tests.utils import create_recipe
+
+
+def similar_url(recipe_id):
+    """Create and return a similar recipes URL."""
+    return reverse("recipe:recipe-similar", args=[recipe_id])
+
+
+class RecipeSimilarAPITests(TestCase):
+    """Test listing similar recipes."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "user@example.com",
+            "testpass123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.vegan, self.dinner = (
+            Tag.objects.create(user=self.user, name=name)
+            for name in ["Vegan", "Dinner"]
+        )
+        self.rice, self.beans, self.corn = (
+            Ingredient.objects.create(user=self.user, name=name)
+            for name in ["Rice", "Beans", "Corn"]
+        )
+        self.recipe = create_recipe(
+            self.user,
+            [self.vegan, self.dinner],
+            [self.rice, self.beans],
+            title="Rice and beans",
+        )
+
+    def similar(self, recipe, **params):
+        """Return the similar recipes as (title, similarity) pairs."""
+        res = self.client.get(similar_url(recipe.id), params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        return [
+            (recipe["title"], round(recipe["similarity"], 3))
+            for recipe in res.data
+        ]
+
+    def test_ranked_by_weighted_jaccard(self):
+        """Test recipes sharing more, and ingredients over tags, rank first."""
+        create_recipe(self.user, [self.vegan], title="Vegan")
+        create_recipe(self.user, ingredients=[self.rice], title="Rice")
+        create_recipe(
+            self.user,
+            [self.vegan, self.dinner],
+            [self.rice, self.beans],
+            title="Same",
+        )
+        create_recipe(self.user, ingredients=[self.corn], title="Corn")
+
+        # A shared ingredient weighs 2 and a tag 1: "Rice" shares 2 of
+        # 2 + 4, "Vegan" 1 of 2 + 4.
+        self.assertEqual(self.similar(self.recipe), [
+            ("Same", 1.0),
+            ("Rice", 0.333),
+            ("Vegan", 0.167),
+        ])
+        self.assertEqual(
+            self.similar(self.recipe, limit=1), [("Same", 1.0)]
+        )
+
+    @override_settings(RECIPE_SIMILAR_MAX_LIMIT=1)
+    def test_limit_validated_and_capped(self):
+        """Test the limit is capped and invalid limits are rejected."""
+        create_recipe(self.user, [self.vegan], title="Vegan")
+        create_recipe(self.user, ingredients=[self.rice], title="Rice")
+
+        self.assertEqual(len(self.similar(self.recipe, limit=5)), 1)
+        for limit in ["abc", 0]:
+            res = self.client.get(
+                similar_url(self.recipe.id), {"limit": limit}
+            )
+
+            self.assertEqual(
+                res.status_code, status.HTTP_400_BAD_REQUEST, limit
+            )
+            self.assertIn("limit", res.data)
+
+    @override_settings(RECIPE_SIMILARITY_WEIGHTS={"ingredients": 1})
+    def test_weights(self):
+        """Test relations without a weight are left out."""
+        create_recipe(self.user, [self.vegan], title="Vegan")
+        create_recipe(
+            self.user, ingredients=[self.beans, self.corn], title="Beans"
+        )
+
+        self.assertEqual(self.similar(self.recipe), [("Beans", 0.333)])
+
+    def test_limited_to_user(self):
+        """Test only the user's recipes are compared or found."""
+        other_user = get_user_model().objects.create_user(
+            "other@example.com",
+            "testpass123",
+        )
+        other = create_recipe(other_user, title="Other")
+        other.ingredients.add(self.rice)
+
+        self.assertEqual(self.similar(self.recipe), [])
+        res = self.client.get(similar_url(other.id))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_recipe_without_links(self):
+        """Test a recipe without tags or ingredients has no similar ones."""
+        recipe = create_recipe(self.user)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.similar(recipe), [])
+
+    def test_query_count(self):
+        """Test the lookup costs the same queries for any number of recipes."""
+        for n in range(5):
+            create_recipe(self.user, [self.vegan], [self.corn])
+
+        # The recipe, the matches and one query per rendered relation.
+        with self.assertNumQueries(4):
+            self.assertEqual(len(self.similar(self.recipe)), 5)
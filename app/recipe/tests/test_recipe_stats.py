@@ -0,0 +1,159 @@
+"""
+Tests for the recipe statistics API.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tag, Ingredient
+from recipe.cache import get_cache
+from recipe.tests.utils import create_recipe
+
+
+STATS_URL = reverse("recipe:stats")
+
+
+class PublicRecipeStatsAPITests(TestCase):
+    """Test unauthenticated API requests."""
+
+    def test_auth_required(self):
+        """Test auth is required to get the statistics."""
+        res = APIClient().get(STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(RECIPE_STATS_BUCKETS=2, RECIPE_STATS_TOP=2)
+class PrivateRecipeStatsAPITests(TestCase):
+    """Test authenticated statistics requests."""
+
+    def setUp(self):
+        get_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            "user@example.com",
+            "testpass123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_distributions(self):
+        """Test the summaries, percentiles and histograms of recipes."""
+        for n in range(1, 5):
+            create_recipe(
+                user=self.user,
+                price=Decimal(f"{n}.00"),
+                time_minutes=n * 10,
+            )
+        other_user = get_user_model().objects.create_user(
+            "other@example.com",
+            "testpass123",
+        )
+        create_recipe(user=other_user, price=Decimal("100.00"))
+
+        res = self.client.get(STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data["totals"], {"recipes": 4, "tags": 0, "ingredients": 0}
+        )
+        price = res.data["price"]
+        self.assertEqual(
+            (price["min"], price["max"], price["avg"]), (1.0, 4.0, 2.5)
+        )
+        self.assertEqual(
+            price["percentiles"],
+            {"p25": 1.75, "p50": 2.5, "p75": 3.25, "p90": 3.7},
+        )
+        self.assertEqual(price["histogram"], [
+            {"min": 1.0, "max": 2.5, "count": 2},
+            {"min": 2.5, "max": 4.0, "count": 2},
+        ])
+        self.assertEqual(
+            res.data["time_minutes"]["percentiles"]["p50"], 25.0
+        )
+        self.assertEqual(
+            [b["count"] for b in res.data["time_minutes"]["histogram"]],
+            [2, 2],
+        )
+
+    def test_top_tags_and_ingredients(self):
+        """Test the most used links come with their recipe averages."""
+        vegan, quick, unused = (
+            Tag.objects.create(user=self.user, name=name)
+            for name in ["Vegan", "Quick", "Unused"]
+        )
+        salt = Ingredient.objects.create(user=self.user, name="Salt")
+        for price, time_minutes in [("2.00", 10), ("4.00", 30)]:
+            recipe = create_recipe(
+                user=self.user,
+                price=Decimal(price),
+                time_minutes=time_minutes,
+            )
+            recipe.tags.add(vegan)
+            recipe.ingredients.add(salt)
+        create_recipe(user=self.user, price=Decimal("9.00")).tags.add(quick)
+
+        res = self.client.get(STATS_URL)
+
+        self.assertEqual(res.data["totals"]["tags"], 3)
+        self.assertEqual(res.data["top_tags"], [
+            {
+                "id": vegan.id,
+                "name": "Vegan",
+                "recipe_count": 2,
+                "avg_price": 3.0,
+                "avg_time_minutes": 20.0,
+            },
+            {
+                "id": quick.id,
+                "name": "Quick",
+                "recipe_count": 1,
+                "avg_price": 9.0,
+                "avg_time_minutes": 22.0,
+            },
+        ])
+        self.assertEqual(
+            [i["name"] for i in res.data["top_ingredients"]], ["Salt"]
+        )
+
+    def test_empty_and_constant_values(self):
+        """Test users without recipes, or with equal values, get stats."""
+        res = self.client.get(STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["totals"]["recipes"], 0)
+        self.assertEqual(res.data["price"], {
+            "min": None,
+            "max": None,
+            "avg": None,
+            "percentiles": {},
+            "histogram": [],
+        })
+
+        create_recipe(user=self.user)
+        create_recipe(user=self.user)
+        res = self.client.get(STATS_URL)
+
+        self.assertEqual(
+            res.data["price"]["histogram"],
+            [{"min": 5.25, "max": 5.25, "count": 2}],
+        )
+
+    def test_cached_until_data_changes(self):
+        """Test repeated requests are served from the cache."""
+        create_recipe(user=self.user)
+        self.client.get(STATS_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(STATS_URL)
+        self.assertEqual(res.data["totals"]["recipes"], 1)
+
+        create_recipe(user=self.user)
+        res = self.client.get(STATS_URL)
+
+        self.assertEqual(res.data["totals"]["recipes"], 2)
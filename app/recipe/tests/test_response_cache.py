@@ -0,0 +1,170 @@
+"""
+Tests for the cached recipe API responses.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tag
+from recipe.cache import get_cache, response_cache_stats
+from recipe.tests.utils import create_recipe
+
+
+RECIPES_URL = reverse("recipe:recipe-list")
+TAGS_URL = reverse("recipe:tag-list")
+BULK_URL = reverse("recipe:recipe-bulk")
+CACHE_STATS_URL = reverse("recipe:cache-stats")
+
+
+class ResponseCacheTests(TestCase):
+    """Test list responses are cached per user data version."""
+
+    def setUp(self):
+        get_cache().clear()
+        response_cache_stats.reset()
+        self.user = get_user_model().objects.create_user(
+            "user@example.com",
+            "testpass123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_repeated_list_served_from_cache(self):
+        """Test an unchanged list is served without queries."""
+        create_recipe(user=self.user)
+        res = self.client.get(RECIPES_URL)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(RECIPES_URL)
+
+        self.assertEqual(cached.status_code, status.HTTP_200_OK)
+        self.assertEqual(cached.data, res.data)
+        self.assertEqual(
+            response_cache_stats.as_dict(),
+            {"hits": 1, "misses": 1, "hit_ratio": 0.5},
+        )
+
+    def test_params_normalized(self):
+        """Test the order of query parameters doesn't change the key."""
+        tag = Tag.objects.create(user=self.user, name="Vegan")
+        params = f"tags={tag.id}&tags_match=all"
+        self.client.get(f"{RECIPES_URL}?{params}")
+
+        with self.assertNumQueries(0):
+            self.client.get(f"{RECIPES_URL}?tags_match=all&tags={tag.id}")
+
+    def test_different_params_cached_apart(self):
+        """Test lists with other parameters aren't served from the cache."""
+        create_recipe(user=self.user)
+        self.client.get(RECIPES_URL)
+
+        res = self.client.get(RECIPES_URL, {"page_size": 1})
+
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertEqual(response_cache_stats.as_dict()["misses"], 2)
+
+    def test_users_cached_apart(self):
+        """Test users never get each other's cached lists."""
+        create_recipe(user=self.user)
+        self.client.get(RECIPES_URL)
+        other_user = get_user_model().objects.create_user(
+            "other@example.com",
+            "testpass123",
+        )
+
+        self.client.force_authenticate(other_user)
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.data["results"], [])
+
+    def test_write_invalidates_lists(self):
+        """Test recipe writes through the API invalidate the lists."""
+        self.client.get(RECIPES_URL)
+
+        payload = {
+            "title": "New recipe",
+            "time_minutes": 10,
+            "price": "2.50",
+            "tags": [{"name": "Quick"}],
+        }
+        self.client.post(RECIPES_URL, payload, format="json")
+        recipes = self.client.get(RECIPES_URL)
+        tags = self.client.get(TAGS_URL)
+
+        self.assertEqual(len(recipes.data["results"]), 1)
+        self.assertEqual(tags.data[0]["name"], "Quick")
+
+    def test_link_changes_invalidate_lists(self):
+        """Test changing the tags of a recipe invalidates the lists."""
+        recipe = create_recipe(user=self.user)
+        tag = Tag.objects.create(user=self.user, name="Vegan")
+        self.client.get(RECIPES_URL)
+        self.client.get(TAGS_URL, {"assigned_only": 1})
+
+        recipe.tags.add(tag)
+        recipes = self.client.get(RECIPES_URL)
+        tags = self.client.get(TAGS_URL, {"assigned_only": 1})
+
+        self.assertEqual(recipes.data["results"][0]["tags"][0]["id"], tag.id)
+        self.assertEqual(tags.data[0]["id"], tag.id)
+
+        tag.recipe_set.clear()
+        recipes = self.client.get(RECIPES_URL)
+
+        self.assertEqual(recipes.data["results"][0]["tags"], [])
+
+    def test_bulk_write_invalidates_lists(self):
+        """Test bulk writes, which bypass model signals, invalidate too."""
+        recipe = create_recipe(user=self.user)
+        self.client.get(RECIPES_URL)
+
+        payload = [
+            {"op": "update", "id": recipe.id, "data": {"title": "Renamed"}},
+        ]
+        self.client.post(BULK_URL, payload, format="json")
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.data["results"][0]["title"], "Renamed")
+
+
+class CacheStatsApiTests(TestCase):
+    """Test reading the cache statistics."""
+
+    def setUp(self):
+        get_cache().clear()
+        response_cache_stats.reset()
+        self.client = APIClient()
+
+    def test_admin_reads_stats(self):
+        """Test staff users get the response and token cache counters."""
+        admin = get_user_model().objects.create_superuser(
+            "admin@example.com",
+            "testpass123",
+        )
+        self.client.force_authenticate(admin)
+        self.client.get(RECIPES_URL)
+        self.client.get(RECIPES_URL)
+
+        res = self.client.get(CACHE_STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data["response_cache"],
+            {"hits": 1, "misses": 1, "hit_ratio": 0.5},
+        )
+        self.assertIn("hit_ratio", res.data["token_cache"])
+
+    def test_stats_need_staff(self):
+        """Test other users can't read the cache statistics."""
+        user = get_user_model().objects.create_user(
+            "user@example.com",
+            "testpass123",
+        )
+        self.client.force_authenticate(user)
+
+        res = self.client.get(CACHE_STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -90,6 +90,17 @@ class PrivateTagsApiTests(TestCase):
         tag.refresh_from_db()
         self.assertEqual(tag.name, payload["name"])
 
+    def test_update_tag_name_clash(self):
+        """Test renaming a tag to an existing name returns an error."""
+        Tag.objects.create(user=self.user, name="Dessert")
+        tag = Tag.objects.create(user=self.user, name="After Dinner")
+
+        res = self.client.patch(detail_url(tag.id), {"name": "Dessert"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        tag.refresh_from_db()
+        self.assertEqual(tag.name, "After Dinner")
+
     def test_delete_tag(self):
         """Test deleting a tag."""
         tag = Tag.objects.create(user=self.user, name="Breakfast")
@@ -141,4 +152,91 @@ class PrivateTagsApiTests(TestCase):
 
         res = self.client.get(TAGS_URL, {'assigned_only': 1})
 
-        self.assertEqual(len(res.data), 1)
\ No newline at end of file
+        self.assertEqual(len(res.data), 1)
+
+    def test_tags_with_counts(self):
+        """Test tags can be listed with their recipe counts."""
+        tag = Tag.objects.create(user=self.user, name="Breakfast")
+        recipe = Recipe.objects.create(
+            title="Pancakes",
+            time_minutes=5,
+            price=Decimal("5.00"),
+            user=self.user,
+        )
+        recipe.tags.add(tag)
+
+        res = self.client.get(TAGS_URL, {"with_counts": 1})
+
+        self.assertEqual(
+            res.data, [{"id": tag.id, "name": "Breakfast", "recipe_count": 1}]
+        )
+        res = self.client.get(TAGS_URL)
+        self.assertNotIn("recipe_count", res.data[0])
+
+    def test_tags_with_counts_values(self):
+        """Test boolean words turn the counts on and other values fail."""
+        Tag.objects.create(user=self.user, name="Breakfast")
+
+        res = self.client.get(TAGS_URL, {"with_counts": "true"})
+        self.assertIn("recipe_count", res.data[0])
+        res = self.client.get(TAGS_URL, {"with_counts": "no"})
+        self.assertNotIn("recipe_count", res.data[0])
+
+        res = self.client.get(TAGS_URL, {"with_counts": "maybe"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("with_counts", res.data)
+
+    def test_assigned_only_values(self):
+        """Test assigned_only takes boolean words and rejects others."""
+        Tag.objects.create(user=self.user, name="Unused")
+
+        res = self.client.get(TAGS_URL, {"assigned_only": "true"})
+        self.assertEqual(res.data, [])
+        res = self.client.get(TAGS_URL, {"assigned_only": "false"})
+        self.assertEqual(len(res.data), 1)
+
+        res = self.client.get(TAGS_URL, {"assigned_only": "2"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("assigned_only", res.data)
+
+    def test_autocomplete_tags(self):
+        """Test suggesting tags by prefix and similarity."""
+        for name in ["Dinner", "Dinner party", "Diner", "Dessert"]:
+            Tag.objects.create(user=self.user, name=name)
+        other_user = create_user(email="other@example.com")
+        Tag.objects.create(user=other_user, name="Dinner club")
+
+        res = self.client.get(TAGS_URL, {"q": "dinner"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [tag["name"] for tag in res.data],
+            ["Dinner", "Diner", "Dinner party"],
+        )
+        res = self.client.get(TAGS_URL, {"q": "Di"})
+        self.assertEqual(
+            [tag["name"] for tag in res.data],
+            ["Diner", "Dinner", "Dinner party"],
+        )
+
+    def test_autocomplete_ranks_used_tags_first(self):
+        """Test equally similar tags are ordered by usage, and limited."""
+        Tag.objects.create(user=self.user, name="Soup A")
+        tag = Tag.objects.create(user=self.user, name="Soup B")
+        recipe = Recipe.objects.create(
+            title="Tomato soup",
+            time_minutes=5,
+            price=Decimal("5.00"),
+            user=self.user,
+        )
+        recipe.tags.add(tag)
+
+        res = self.client.get(TAGS_URL, {"q": "soup"})
+
+        self.assertEqual(
+            [tag["name"] for tag in res.data], ["Soup B", "Soup A"]
+        )
+        res = self.client.get(TAGS_URL, {"q": "soup", "limit": 1})
+        self.assertEqual([tag["name"] for tag in res.data], ["Soup B"])
+        res = self.client.get(TAGS_URL, {"q": "soup", "limit": "abc"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,21 @@
+"""
+Helpers shared by the recipe tests.
+"""
+from decimal import Decimal
+
+from core.models import Recipe
+
+
+def create_recipe(user, tags=(), ingredients=(), **params):
+    """Create and return a sample recipe with the tags and ingredients."""
+    defaults = {
+        "title": "Sample recipe title",
+        "time_minutes": 22,
+        "price": Decimal("5.25"),
+    }
+    defaults.update(params)
+    recipe = Recipe.objects.create(user=user, **defaults)
+    recipe.tags.add(*tags)
+    recipe.ingredients.add(*ingredients)
+
+    return recipe
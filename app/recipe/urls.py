@@ -19,4 +19,10 @@ router.register("ingredients", views.IngredientsViewSet)
 
 app_name = "recipe"
 
-urlpatterns = [path("", include(router.urls))]
+urlpatterns = [
+    path("stats/", views.RecipeStatsView.as_view(), name="stats"),
+    path(
+        "cache-stats/", views.CacheStatsView.as_view(), name="cache-stats"
+    ),
+    path("", include(router.urls)),
+]
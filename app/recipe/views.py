@@ -1,77 +1,405 @@
 """
 Views for the recipe APIs.
 """
+import csv
+import itertools
+import re
+
 from drf_spectacular.utils import (
     extend_schema_view,
     extend_schema,
     OpenApiParameter,
     OpenApiTypes,
 )
+from django.conf import settings
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramSimilarity,
+)
+from django.http import StreamingHttpResponse
+from django.db.models import (
+    Count,
+    F,
+    FloatField,
+    Q,
+)
+from django.db.models.functions import Cast
 from rest_framework import (
+    generics,
     viewsets,
     mixins,
     status,
 )
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
-from rest_framework.authentication import TokenAuthentication
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.views import APIView
 
 from core.models import (
+    SEARCH_CONFIG,
+    MissingItemCount,
+    MissingItems,
     Recipe,
     Tag,
     Ingredient,
 )
+from core.renderers import NDJSONRenderer, ORJSONRenderer
 from recipe import serializers
+from recipe.bulk import RecipeBulkWriter
+from recipe.cache import (
+    CachedListMixin,
+    ConditionalRequestMixin,
+    get_cache,
+    get_response_cache_key,
+    response_cache_stats,
+)
+from recipe.imports import READERS, RecipeImporter
+from recipe.pagination import KeysetPagination, get_limit
+from recipe.readers import ReaderMixin, RecipeReader
+from recipe.stats import get_recipe_stats
+from user.authentication import CachedTokenAuthentication, token_cache
+
+
+FIELDS_PARAMETERS = [
+    OpenApiParameter(
+        "fields",
+        OpenApiTypes.STR,
+        description="Comma separated list of fields to return.",
+    ),
+    OpenApiParameter(
+        "omit",
+        OpenApiTypes.STR,
+        description="Comma separated list of fields to leave out.",
+    ),
+]
 
 
 @extend_schema_view(
+    retrieve=extend_schema(parameters=FIELDS_PARAMETERS),
     list=extend_schema(
-        parameters=[
+        parameters=FIELDS_PARAMETERS + [
             OpenApiParameter(
                 "tags",
                 OpenApiTypes.STR,
                 description="Comma separated list of IDs to filter",
             ),
+            OpenApiParameter(
+                "tags_match",
+                OpenApiTypes.STR, enum=["any", "all"],
+                description="Match recipes with any or all of the tags.",
+            ),
             OpenApiParameter(
                 "ingredients",
                 OpenApiTypes.STR,
                 description="Comma separated list of ingredient IDs to filter",
-            )
+            ),
+            OpenApiParameter(
+                "ingredients_match",
+                OpenApiTypes.STR, enum=["any", "all"],
+                description="Match recipes with any or all ingredients.",
+            ),
+            OpenApiParameter(
+                "max_time",
+                OpenApiTypes.INT,
+                description="Only recipes taking at most this many minutes.",
+            ),
+            OpenApiParameter(
+                "min_price",
+                OpenApiTypes.NUMBER,
+                description="Only recipes costing at least this much.",
+            ),
+            OpenApiParameter(
+                "max_price",
+                OpenApiTypes.NUMBER,
+                description="Only recipes costing at most this much.",
+            ),
+            OpenApiParameter(
+                "ordering",
+                OpenApiTypes.STR,
+                enum=[
+                    "price", "-price", "time_minutes", "-time_minutes",
+                    "title", "-title",
+                ],
+                description="Order by price, time or title instead of the "
+                "newest first.",
+            ),
+            OpenApiParameter(
+                "search",
+                OpenApiTypes.STR,
+                description="Words to search titles and descriptions for, "
+                "the last one may be partial. The best matches come first.",
+            ),
         ]
     )
 )
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(
+    ConditionalRequestMixin,
+    CachedListMixin,
+    ReaderMixin,
+    viewsets.ModelViewSet,
+):
     """View for manage recipe APIs."""
 
     serializer_class = serializers.RecipeDetailSerializer
     # We specify which model our Viewset is connected to
     queryset = Recipe.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    # Nested relations rendered by the recipe serializers.
+    related_fields = ["tags", "ingredients"]
+    # Each has a (user, field, id) index, scanned in either direction.
+    ordering_fields = ["price", "time_minutes", "title"]
+    # Range filter parameters and the lookups they apply.
+    range_filters = {
+        "max_time": "time_minutes__lte",
+        "min_price": "price__gte",
+        "max_price": "price__lte",
+    }
+
+    def _get_match_mode(self, param):
+        """Return whether a filter should match any or all of its IDs."""
+        match = self.request.query_params.get(f"{param}_match", "any")
+        if match not in ("any", "all"):
+            raise ValidationError(
+                {f"{param}_match": ['Must be either "any" or "all".']}
+            )
+        return match
 
-    def _params_to_ints(self, qs):
-        """Convert a list of strings to integers."""
-        # We convert our comma separated strings ie "1,2,3" into ints
-        return [int(str_id) for str_id in qs.split(",")]
+    def _filter_by_related(self, queryset, field_name, ids, match):
+        """Filter recipes linked to any or all of the given related IDs."""
+        ids_field = {
+            field: ids_field
+            for ids_field, field in Recipe.LINK_ID_FIELDS.items()
+        }[field_name]
+        # The recipe rows hold the linked IDs, so either match is an array
+        # operator (&& or @>) checked on the row or looked up in its GIN
+        # index, without joining the links.
+        lookup = "contains" if match == "all" else "overlap"
+
+        return queryset.filter(**{f"{ids_field}__{lookup}": ids})
 
     # We override the get_queryset method to retrieve recipes just for
     # the specific authenticated user.
     def get_queryset(self):
         """Retrieve recipes for authenticated user."""
-        tags = self.request.query_params.get("tags")
-        ingredients = self.request.query_params.get("ingredients")
+        filters = self._get_filters()
         queryset = self.queryset
-        if tags:
-            tag_ids = self._params_to_ints(tags)
-            queryset = queryset.filter(tags__id__in=tag_ids)
-        if ingredients:
-            ingredient_ids = self._params_to_ints(ingredients)
-            queryset = queryset.filter(ingredients__id__in=ingredient_ids)
+        for field_name in self.related_fields:
+            ids = filters.get(field_name)
+            if ids:
+                queryset = self._filter_by_related(
+                    queryset,
+                    field_name,
+                    ids,
+                    self._get_match_mode(field_name),
+                )
 
-        return queryset.filter(
-            user=self.request.user
-        ).order_by("-id").distinct()
+        queryset = queryset.filter(user=self.request.user, **{
+            self.range_filters[param]: value
+            for param, value in filters.items()
+            if param in self.range_filters
+        })
+        if self.action == "pantry":
+            queryset = self._filter_by_pantry(queryset)
+        elif self.action == "similar":
+            queryset = self._filter_similar(queryset)
+        queryset = self._apply_query_plan(queryset)
+
+        search_query = self._get_search_query()
+        if search_query is not None:
+            queryset = queryset.filter(search_vector=search_query)
+            if self._get_ordering() is None:
+                # The GIN index finds the matching recipes, and only those
+                # get ranked. We annotate after the query plan so the rank
+                # is in the rows for the pagination cursor, as a double
+                # since a real doesn't round trip through it exactly.
+                queryset = queryset.annotate(search_rank=Cast(
+                    SearchRank(F("search_vector"), search_query),
+                    FloatField(),
+                ))
+
+        return queryset.order_by(*self.get_keyset_ordering())
+
+    def _get_filters(self):
+        """Return the validated related and range filters of the list."""
+        serializer = serializers.RecipeFilterSerializer(
+            data=self.request.query_params
+        )
+        serializer.is_valid(raise_exception=True)
+
+        return serializer.validated_data
+
+    def _get_ordering(self):
+        """Return the requested ordering with its tie breaker, if any."""
+        ordering = self.request.query_params.get("ordering")
+        if not ordering:
+            return None
+        if ordering.lstrip("-") not in self.ordering_fields:
+            raise ValidationError({"ordering": [
+                f"Must be one of: {', '.join(self.ordering_fields)}, "
+                "optionally prefixed with -."
+            ]})
+        # The ID breaks ties in the same direction, so one index scan
+        # returns the rows in order.
+        tie_breaker = "-id" if ordering.startswith("-") else "id"
+
+        return (ordering, tie_breaker)
+
+    def _get_search_query(self):
+        """Return the query of ?search=, the last word matching a prefix."""
+        words = re.findall(
+            r"[^\W_]+", self.request.query_params.get("search", "")
+        )
+        if not words:
+            return None
+
+        # Only the word being typed is a prefix, since prefixes make the
+        # GIN index collect every matching lexeme instead of looking one
+        # up. We only pass on word characters, so the query is well formed.
+        words[-1] += ":*"
+        return SearchQuery(
+            " & ".join(words), search_type="raw", config=SEARCH_CONFIG
+        )
+
+    def _get_pantry(self):
+        """Return the validated pantry parameters."""
+        serializer = serializers.RecipePantrySerializer(
+            data=self.request.query_params
+        )
+        serializer.is_valid(raise_exception=True)
+
+        return serializer.validated_data
+
+    def _filter_by_pantry(self, queryset):
+        """Annotate the recipes using the pantry with what they miss."""
+        pantry = self._get_pantry()
+        ids = set(pantry.get("pantry", []))
+        if pantry.get("pantry_names"):
+            ids.update(Ingredient.objects.filter(
+                user=self.request.user, name__in=pantry["pantry_names"]
+            ).values_list("id", flat=True))
+
+        # The GIN index finds the recipes using any of the ingredients,
+        # then only their arrays are compared with the pantry. The missing
+        # IDs are only built for the rows returned.
+        queryset = queryset.filter(ingredient_ids__overlap=list(ids)).annotate(
+            missing_count=MissingItemCount("ingredient_ids", ids),
+            missing_ingredients=MissingItems("ingredient_ids", ids),
+        )
+        if "max_missing" in pantry:
+            queryset = queryset.filter(
+                missing_count__lte=pantry["max_missing"]
+            )
+
+        return queryset
+
+    def _filter_similar(self, queryset):
+        """Annotate the recipes sharing links with a recipe with their
+        similarity to it."""
+        recipe = get_object_or_404(
+            self.queryset.filter(user=self.request.user).only(
+                *Recipe.LINK_ID_FIELDS
+            ),
+            pk=self.kwargs["pk"],
+        )
+        # The GIN indexes of the ID arrays map each tag and ingredient to
+        # its recipes, so only the recipes sharing one are compared
+        # instead of the whole collection.
+        shared = Q()
+        for ids_field, field_name in Recipe.LINK_ID_FIELDS.items():
+            ids = getattr(recipe, ids_field)
+            if ids and settings.RECIPE_SIMILARITY_WEIGHTS.get(field_name):
+                shared |= Q(**{f"{ids_field}__overlap": ids})
+        queryset = queryset.annotate(
+            similarity=Recipe.objects.get_similarity(recipe)
+        )
+        if not shared:
+            return queryset.none()
+
+        return queryset.filter(shared).exclude(pk=recipe.pk)
+
+    def get_keyset_ordering(self):
+        """Return the ordering of the recipes, also keying their pages.
+
+        Recipes come newest first, search results by rank, unless an
+        ordering is requested. Pantry matches come with the fewest
+        missing ingredients first, and similar recipes the most similar
+        first.
+        """
+        if self.action == "pantry":
+            return ("missing_count", "-id")
+        if self.action == "similar":
+            return ("-similarity", "-id")
+        ordering = self._get_ordering()
+        if ordering is not None:
+            return ordering
+        if self._get_search_query() is not None:
+            return ("-search_rank", "-id")
+
+        return ("-id",)
+
+    def _apply_query_plan(self, queryset):
+        """Load only the columns and relations the action renders."""
+        if self.action in (
+            "list", "retrieve", "export", "pantry", "similar"
+        ):
+            # The reader renders plain rows holding only the columns of
+            # the selected fields, and loads each selected relation with
+            # one grouped query, so the query count doesn't grow with the
+            # number of recipes.
+            columns = self.get_reader().get_columns()
+            # The pagination cursor holds the values of the ordering.
+            columns += [
+                field.lstrip("-") for field in self._get_ordering() or ()
+                if field.lstrip("-") not in columns
+            ]
+            queryset = queryset.values(*columns)
+        elif self.action == "upload_image":
+            # Saving a partially loaded recipe only writes the loaded
+            # columns, so the upload touches nothing but the image. We
+            # load the owner too for the cache invalidation.
+            queryset = queryset.only(
+                "user", *serializers.RecipeImageSerializer.Meta.fields
+            )
+        # Updates run on the plain queryset, since DRF drops any
+        # prefetched relations after saving and the writes need every column.
+
+        return queryset
+
+    def get_rendered_fields(self):
+        """Return the serializer fields selected by ?fields= and ?omit=."""
+        available = self.get_serializer_class().Meta.fields
+        fields = list(available)
+        for param in ("fields", "omit"):
+            value = self.request.query_params.get(param)
+            if not value:
+                continue
+            names = [name.strip() for name in value.split(",")]
+            unknown = [name for name in names if name not in available]
+            if unknown:
+                raise ValidationError(
+                    {param: [f"Unknown fields: {', '.join(unknown)}."]}
+                )
+            if param == "fields":
+                fields = [field for field in fields if field in names]
+            else:
+                fields = [field for field in fields if field not in names]
+
+        return fields
+
+    def get_reader(self):
+        """Return the reader rendering the selected fields of recipes."""
+        return RecipeReader(
+            self.get_serializer_class(),
+            self.get_rendered_fields(),
+            self.get_serializer_context(),
+        )
 
     # We override the get_serializer_class so that the more specific
     # details don't show when we list all recipes.
@@ -79,8 +407,16 @@ class RecipeViewSet(viewsets.ModelViewSet):
         """Return the serializer class for request."""
         if self.action == "list":
             return serializers.RecipeSerializer
+        elif self.action == "pantry":
+            return serializers.RecipePantryMatchSerializer
+        elif self.action == "similar":
+            return serializers.RecipeSimilarSerializer
         elif self.action == "upload_image":
             return serializers.RecipeImageSerializer
+        elif self.action == "bulk":
+            return serializers.RecipeBulkItemSerializer
+        elif self.action == "import_recipes":
+            return serializers.RecipeImportSerializer
 
         return self.serializer_class
 
@@ -99,47 +435,346 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @extend_schema(
+        parameters=FIELDS_PARAMETERS,
+        responses=serializers.RecipeDetailSerializer(many=True),
+    )
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="export",
+        renderer_classes=[NDJSONRenderer, ORJSONRenderer],
+    )
+    def export(self, request):
+        """Stream every recipe of the user as newline delimited JSON."""
+        reader = self.get_reader()
+        chunk_size = settings.RECIPE_EXPORT_CHUNK_SIZE
+        # A server-side cursor hands the rows over chunk by chunk, so
+        # memory stays flat however many recipes the user has.
+        rows = self.get_queryset().iterator(chunk_size=chunk_size)
+        renderer = NDJSONRenderer()
+
+        def lines():
+            while True:
+                chunk = list(itertools.islice(rows, chunk_size))
+                if not chunk:
+                    return
+                # The relations of each chunk are loaded in one query each.
+                yield from renderer.render_lines(reader.render(chunk))
+
+        return StreamingHttpResponse(lines(), content_type=renderer.media_type)
+
+    @extend_schema(
+        parameters=FIELDS_PARAMETERS + [
+            OpenApiParameter(
+                "pantry",
+                OpenApiTypes.STR,
+                description="Comma separated list of ingredient IDs in "
+                "the pantry.",
+            ),
+            OpenApiParameter(
+                "pantry_names",
+                OpenApiTypes.STR,
+                description="Name of an ingredient in the pantry, "
+                "repeated for each one.",
+            ),
+            OpenApiParameter(
+                "max_missing",
+                OpenApiTypes.INT,
+                description="Only recipes missing at most this many "
+                "ingredients.",
+            ),
+            OpenApiParameter(
+                "limit",
+                OpenApiTypes.INT,
+                description="Maximum number of recipes to return.",
+            ),
+        ],
+        responses=serializers.RecipePantryMatchSerializer(many=True),
+    )
+    @action(methods=["GET"], detail=False, url_path="pantry")
+    def pantry(self, request):
+        """List the recipes using a pantry, the fewest missing first.
+
+        Recipes cookable from the pantry alone come first, then the ones
+        missing one ingredient, two, and so on.
+        """
+        limit = get_limit(
+            request,
+            settings.RECIPE_PANTRY_LIMIT,
+            settings.RECIPE_PANTRY_MAX_LIMIT,
+        )
+        queryset = self.get_queryset()[:limit]
+
+        return Response(self.get_reader().render(queryset))
+
+    @extend_schema(
+        parameters=FIELDS_PARAMETERS + [
+            OpenApiParameter(
+                "limit",
+                OpenApiTypes.INT,
+                description="Maximum number of recipes to return.",
+            ),
+        ],
+        responses=serializers.RecipeSimilarSerializer(many=True),
+    )
+    @action(methods=["GET"], detail=True, url_path="similar")
+    def similar(self, request, pk=None):
+        """List the recipes sharing the most tags and ingredients with one.
+
+        Recipes are ranked by the weighted Jaccard similarity of their tags
+        and ingredients, by default a shared ingredient weighing twice as
+        much as a shared tag.
+        """
+        limit = get_limit(
+            request,
+            settings.RECIPE_SIMILAR_LIMIT,
+            settings.RECIPE_SIMILAR_MAX_LIMIT,
+        )
+        queryset = self.get_queryset()[:limit]
+
+        return Response(self.get_reader().render(queryset))
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "recipes",
+                OpenApiTypes.STR,
+                required=True,
+                description="Comma separated list of recipe IDs to shop for.",
+            ),
+        ],
+        responses=serializers.ShoppingListItemSerializer(many=True),
+    )
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="shopping-list",
+        url_name="shopping-list",
+    )
+    def shopping_list(self, request):
+        """List the ingredients of recipes, each once, ordered by name.
+
+        Each ingredient comes with the number and IDs of the given recipes
+        using it. Recipes of other users are left out.
+        """
+        serializer = serializers.RecipeShoppingListSerializer(
+            data=request.query_params
+        )
+        serializer.is_valid(raise_exception=True)
+        # One grouped query over the links of the recipes, joined to the
+        # user's ingredients for their names.
+        ingredients = Ingredient.objects.filter(
+            user=request.user,
+            recipe__id__in=serializer.validated_data["recipes"],
+        ).annotate(
+            count=Count("recipe"),
+            recipes=ArrayAgg("recipe__id", ordering="recipe__id"),
+        ).order_by("name").values("id", "name", "count", "recipes")
+
+        return Response(list(ingredients))
+
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="import",
+        url_name="import",
+        parser_classes=[MultiPartParser],
+    )
+    def import_recipes(self, request):
+        """Import recipes from an uploaded NDJSON or CSV file."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        read = READERS[serializer.validated_data["format"]]
+        start_line = serializer.validated_data["start_line"]
+        committed = {
+            "created": 0,
+            "failed": 0,
+            "errors": [],
+            "last_line": start_line,
+        }
+
+        def progress(result):
+            committed.update(result, errors=list(result["errors"]))
+
+        # Uploads are read line by line and written chunk by chunk, each
+        # chunk in its own transaction.
+        try:
+            result = RecipeImporter(request.user).run(
+                read(serializer.validated_data["file"]),
+                start_line=start_line,
+                progress=progress,
+            )
+        except (ValueError, csv.Error) as exc:
+            # The committed chunks stay, so the client can resume the
+            # import after their last line.
+            return Response(
+                {"detail": f"Import stopped: {exc}", **committed},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response(result, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        request=serializers.RecipeBulkItemSerializer(many=True),
+        responses=serializers.RecipeBulkItemSerializer(many=True),
+    )
+    @action(methods=["POST"], detail=False, url_path="bulk")
+    def bulk(self, request):
+        """Create, update and delete many recipes at once."""
+        if not isinstance(request.data, list):
+            raise ValidationError(
+                {"non_field_errors": ["Expected a list of operations."]}
+            )
+        if len(request.data) > settings.RECIPE_BULK_MAX_ITEMS:
+            raise ValidationError({"non_field_errors": [
+                f"At most {settings.RECIPE_BULK_MAX_ITEMS} operations "
+                "are allowed per request."
+            ]})
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        results = RecipeBulkWriter(request.user).write(
+            serializer.validated_data
+        )
+
+        # We render the written recipes with one query per relation. They
+        # are read back by ID alone, the list filters of the query string
+        # don't apply to them.
+        written = Recipe.objects.filter(
+            user=request.user,
+            id__in=[result["id"] for result in results],
+        ).prefetch_related("tags", "ingredients").in_bulk()
+        for result in results:
+            if result["op"] != "delete":
+                result["data"] = serializers.RecipeDetailSerializer(
+                    written[result["id"]],
+                    context=self.get_serializer_context(),
+                ).data
+
+        return Response(results, status=status.HTTP_200_OK)
+
 
 @extend_schema_view(
     list=extend_schema(
         parameters=[
             OpenApiParameter(
                 "assigned_only",
-                OpenApiTypes.INT, enum=[0, 1],
+                OpenApiTypes.BOOL,
                 description="Filter by items assigned to recipes."
-            )
+            ),
+            OpenApiParameter(
+                "with_counts",
+                OpenApiTypes.BOOL,
+                description="Include the number of recipes using each item.",
+            ),
+            OpenApiParameter(
+                "ordering",
+                OpenApiTypes.STR,
+                enum=["name", "-name", "recipe_count", "-recipe_count"],
+                description="Order by name or number of recipes.",
+            ),
+            OpenApiParameter(
+                "q",
+                OpenApiTypes.STR,
+                description="Suggest items whose names start with or are "
+                "similar to this text, the closest and most used first.",
+            ),
+            OpenApiParameter(
+                "limit",
+                OpenApiTypes.INT,
+                description="Maximum number of suggestions to return.",
+            ),
         ]
     )
 )
 class BaseRecipeAttrViewSet(
+    ConditionalRequestMixin,
+    CachedListMixin,
     mixins.DestroyModelMixin,
     mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
     mixins.UpdateModelMixin,
     viewsets.GenericViewSet,
 ):
     """Base viewset for recipe attributes."""
 
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    ordering_fields = ["name", "recipe_count"]
 
     def get_queryset(self):
         """Filter queryset to authenticated user."""
-        assigned_only = bool(
-            int(self.request.query_params.get("assigned_only", 0))
-        )
-        queryset = self.queryset
-        if assigned_only:
-            queryset = queryset.filter(recipe__isnull=False)
+        queryset = self.queryset.filter(user=self.request.user)
+        if self._get_options()["assigned_only"]:
+            # The maintained counts make this a range scan of the
+            # (user, recipe_count, name) index, with no join.
+            queryset = queryset.filter(recipe_count__gt=0)
+        text = self.request.query_params.get("q", "").strip()
+        if text and self.action == "list":
+            return self._autocomplete(queryset, text)
 
+        return queryset.order_by(*self._get_ordering())
+
+    def _autocomplete(self, queryset, text):
+        """Return the best suggestions for the text of an autocomplete."""
+        limit = get_limit(
+            self.request,
+            settings.RECIPE_AUTOCOMPLETE_LIMIT,
+            settings.RECIPE_AUTOCOMPLETE_MAX_LIMIT,
+        )
+        # Both conditions are answered by the trigram index on names, so
+        # only the candidate rows are read instead of every user's item.
         return queryset.filter(
-            user=self.request.user
-        ).order_by("-name").distinct()
+            Q(name__iregex=f"^{re.escape(text)}")
+            | Q(name__trigram_similar=text)
+        ).annotate(
+            similarity=TrigramSimilarity("name", text)
+        ).order_by(
+            "-similarity", "-recipe_count", "name"
+        )[:limit]
+
+    def _get_ordering(self):
+        """Return the requested ordering, by name or recipe count."""
+        ordering = self.request.query_params.get("ordering", "-name")
+        if ordering.lstrip("-") not in self.ordering_fields:
+            raise ValidationError({"ordering": [
+                f"Must be one of: {', '.join(self.ordering_fields)}, "
+                "optionally prefixed with -."
+            ]})
+        if ordering.lstrip("-") == "recipe_count":
+            # Names are unique per user, so they break the ties in the
+            # order of the index.
+            return [ordering, ordering.replace("recipe_count", "name")]
+
+        return [ordering]
+
+    def _get_options(self):
+        """Return the validated options of the list."""
+        serializer = serializers.RecipeAttrFilterSerializer(
+            data=self.request.query_params
+        )
+        serializer.is_valid(raise_exception=True)
+
+        return serializer.validated_data
+
+    def _with_counts(self):
+        """Return whether the recipe counts were requested."""
+        return self._get_options()["with_counts"]
+
+    def get_serializer_class(self):
+        """Return the serializer class for request."""
+        if self._with_counts():
+            return self.count_serializer_class
+
+        return self.serializer_class
 
 
 class TagViewSet(BaseRecipeAttrViewSet):
     """Manage tags in the database."""
 
     serializer_class = serializers.TagSerializer
+    count_serializer_class = serializers.TagCountSerializer
     queryset = Tag.objects.all()
 
 
@@ -147,4 +782,48 @@ class IngredientsViewSet(BaseRecipeAttrViewSet):
     """Manage ingredients in the database."""
 
     serializer_class = serializers.IngredientSerializer
+    count_serializer_class = serializers.IngredientCountSerializer
     queryset = Ingredient.objects.all()
+
+
+class RecipeStatsView(generics.RetrieveAPIView):
+    """View for the statistics of the user's recipes."""
+
+    serializer_class = serializers.RecipeStatsSerializer
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get_object(self):
+        """Compute the statistics of the authenticated user's recipes."""
+        return get_recipe_stats(self.request.user)
+
+    def retrieve(self, request, *args, **kwargs):
+        """Return the statistics, cached until the user's data changes."""
+        cache = get_cache()
+        key = get_response_cache_key(request, "recipe-stats")
+        data = cache.get(key)
+        response_cache_stats.record(hit=data is not None)
+        if data is None:
+            data = self.get_serializer(self.get_object()).data
+            cache.set(key, data, settings.RECIPE_CACHE_TIMEOUT)
+
+        return Response(data)
+
+
+class CacheStatsView(APIView):
+    """View for the hit ratios of the response and token caches.
+
+    The counters belong to the process serving the request, each worker
+    process reports its own.
+    """
+
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    def get(self, request):
+        """Return the counters and hit ratios of the caches."""
+        return Response({
+            "response_cache": response_cache_stats.as_dict(),
+            "token_cache": token_cache.stats(),
+        })
@@ -0,0 +1,115 @@
+"""
+Authentication for the APIs.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from rest_framework.authentication import TokenAuthentication
+
+
+class TokenCache:
+    """Bounded LRU cache of token keys to users that expires entries.
+
+    The cache lives in the process, signals clear entries changed by this
+    process and the time to live bounds how long other processes can
+    serve a stale user.
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # Token key -> (expiry time, user, token), oldest first.
+        self._entries = OrderedDict()
+        self._user_keys = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached (user, token) pair of a key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return entry[1], entry[2]
+
+    def set(self, key, user, token):
+        """Cache the user and token of a key."""
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, user, token)
+            self._user_keys.setdefault(user.pk, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, key):
+        """Drop a token key from the cache."""
+        with self._lock:
+            self._remove(key)
+
+    def invalidate_user(self, user_id):
+        """Drop every token key of a user from the cache."""
+        with self._lock:
+            for key in list(self._user_keys.get(user_id, ())):
+                self._remove(key)
+
+    def clear(self):
+        """Empty the cache and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._user_keys.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Return the cache size and hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            user_keys = self._user_keys.get(entry[1].pk, set())
+            user_keys.discard(key)
+            if not user_keys:
+                self._user_keys.pop(entry[1].pk, None)
+
+
+token_cache = TokenCache(
+    max_size=settings.TOKEN_AUTH_CACHE["MAX_SIZE"],
+    ttl=settings.TOKEN_AUTH_CACHE["TTL"],
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication that caches users by token key."""
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is None:
+            # Invalid keys and inactive users raise and aren't cached.
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, user, token)
+        else:
+            user, token = cached
+
+        # Each request gets its own copy, so changes made while handling
+        # it don't leak into the cached snapshot.
+        return copy.copy(user), token
@@ -0,0 +1,29 @@
+"""
+Signal handlers for the user app.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from rest_framework.authtoken.models import Token
+
+from user.authentication import token_cache
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """Stop authenticating with a deleted token."""
+    token_cache.invalidate(instance.key)
+
+
+@receiver(post_save, sender=Token)
+def invalidate_replaced_token(sender, instance, **kwargs):
+    """Drop the cached tokens of a user who got a new token."""
+    token_cache.invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_changed_user(sender, instance, **kwargs):
+    """Reload users who were changed, deactivated or deleted."""
+    token_cache.invalidate_user(instance.pk)
@@ -0,0 +1,131 @@
+"""
+Tests for the cached token authentication.
+"""
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from user.authentication import TokenCache, token_cache
+
+
+ME_URL = reverse("user:me")
+
+
+class TokenCacheTests(SimpleTestCase):
+    """Test the token cache."""
+
+    def make_user(self, pk):
+        return get_user_model()(pk=pk, email=f"user{pk}@example.com")
+
+    def test_least_recently_used_evicted(self):
+        """Test the oldest unused key is evicted when the cache is full."""
+        cache = TokenCache(max_size=2, ttl=60)
+        cache.set("a", self.make_user(1), None)
+        cache.set("b", self.make_user(2), None)
+        cache.get("a")
+        cache.set("c", self.make_user(3), None)
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+
+    @patch("user.authentication.time.monotonic")
+    def test_entries_expire(self, patched_monotonic):
+        """Test entries are dropped once their time to live is over."""
+        cache = TokenCache(max_size=2, ttl=60)
+        patched_monotonic.return_value = 100
+        cache.set("a", self.make_user(1), None)
+
+        patched_monotonic.return_value = 159
+        self.assertIsNotNone(cache.get("a"))
+        patched_monotonic.return_value = 161
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_invalidate_user(self):
+        """Test every key of a user can be dropped at once."""
+        cache = TokenCache(max_size=10, ttl=60)
+        cache.set("a", self.make_user(1), None)
+        cache.set("b", self.make_user(1), None)
+        cache.set("c", self.make_user(2), None)
+
+        cache.invalidate_user(1)
+
+        self.assertIsNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+
+    def test_stats(self):
+        """Test hits and misses are counted."""
+        cache = TokenCache(max_size=10, ttl=60)
+        cache.get("a")
+        cache.set("a", self.make_user(1), None)
+        cache.get("a")
+        cache.get("a")
+
+        self.assertEqual(
+            cache.stats(),
+            {"size": 1, "hits": 2, "misses": 1, "hit_ratio": 2 / 3},
+        )
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test authenticating API requests with cached tokens."""
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpass123",
+            name="Test Name",
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_cached_token_skips_queries(self):
+        """Test repeated requests authenticate without queries."""
+        with self.assertNumQueries(1):
+            res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["email"], self.user.email)
+        self.assertEqual(token_cache.stats()["hits"], 1)
+
+    def test_deleted_token_rejected(self):
+        """Test a deleted token stops authenticating."""
+        self.client.get(ME_URL)
+
+        self.token.delete()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_rejected(self):
+        """Test a deactivated user stops authenticating."""
+        self.client.get(ME_URL)
+
+        self.user.is_active = False
+        self.user.save()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_changed_user_reloaded(self):
+        """Test changes to a user are seen by the next request."""
+        self.client.get(ME_URL)
+
+        res = self.client.patch(ME_URL, {"name": "Updated name"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data["name"], "Updated name")
@@ -1,10 +1,11 @@
 """
 Views for the user API.
 """
-from rest_framework import generics, authentication, permissions
+from rest_framework import generics, permissions
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.settings import api_settings
 
+from .authentication import CachedTokenAuthentication
 from .serializers import (
     UserSerializer,
     AuthTokenSerializer,
@@ -21,8 +22,8 @@ class CreateTokenView(ObtainAuthToken):
     """Create a new auth token for user."""
 
     serializer_class = AuthTokenSerializer
-    # We add renderer_classes as follows in order to insure
-    # a browsable API.
+    # ObtainAuthToken only renders JSON, so we use the default renderers
+    # to get the fast renderer and, when enabled, a browsable API.
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
 
 
@@ -33,7 +34,7 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
 
     # Token authentication is used to check the user, as in
     # how do we know the user is who they say they are.
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
 
     # Permission classes are used to see what permissions the user has.
     permission_classes = [permissions.IsAuthenticated]